@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+Z_SPIKE_THRESHOLD = 3.0
+CHANGE_POINT_SIGMA = 3.0
+MIN_SEGMENT_POINTS = 3
+
+FloatArray = npt.NDArray[np.float64]
+
+
+@dataclass
+class SeriesStats:
+    points: int
+    last: float
+    min: float
+    max: float
+    mean: float
+    slope_per_hour: float
+    spikes: int
+    max_z: float
+    max_z_at: float | None
+    change_at: float | None
+    mean_before: float | None
+    mean_after: float | None
+
+    @property
+    def is_anomalous(self) -> bool:
+        return self.spikes > 0 or self.change_at is not None
+
+
+def _change_point(values: FloatArray) -> tuple[int, float, float] | None:
+    n = values.size
+    if n < 2 * MIN_SEGMENT_POINTS:
+        return None
+
+    k = np.arange(MIN_SEGMENT_POINTS, n - MIN_SEGMENT_POINTS + 1)
+    csum = np.cumsum(values)
+    csum_sq = np.cumsum(values**2)
+    left_mean = csum[k - 1] / k
+    right_mean = (csum[-1] - csum[k - 1]) / (n - k)
+    left_var = csum_sq[k - 1] / k - left_mean**2
+    right_var = (csum_sq[-1] - csum_sq[k - 1]) / (n - k) - right_mean**2
+    gain = k * (n - k) / n * (left_mean - right_mean) ** 2
+
+    best = int(np.argmax(gain))
+    pooled_std = float(np.sqrt(max((k[best] * left_var[best] + (n - k[best]) * right_var[best]) / n, 0.0)))
+    shift = abs(float(right_mean[best] - left_mean[best]))
+    if shift == 0.0 or shift <= CHANGE_POINT_SIGMA * pooled_std:
+        return None
+    return int(k[best]), float(left_mean[best]), float(right_mean[best])
+
+
+def series_stats(timestamps: FloatArray, values: FloatArray) -> SeriesStats | None:
+    finite = np.isfinite(values)
+    timestamps = timestamps[finite]
+    values = values[finite]
+    if values.size == 0:
+        return None
+
+    mean = float(values.mean())
+    std = float(values.std())
+    slope = 0.0
+    if values.size >= 2 and float(np.ptp(timestamps)) > 0:
+        slope = float(np.polyfit(timestamps - timestamps[0], values, 1)[0]) * 3600
+
+    spikes = 0
+    max_z = 0.0
+    max_z_at: float | None = None
+    if std > 0:
+        z = np.abs(values - mean) / std
+        spikes = int(np.count_nonzero(z > Z_SPIKE_THRESHOLD))
+        peak = int(np.argmax(z))
+        max_z = float(z[peak])
+        max_z_at = float(timestamps[peak])
+
+    change = _change_point(values)
+    return SeriesStats(
+        points=int(values.size),
+        last=float(values[-1]),
+        min=float(values.min()),
+        max=float(values.max()),
+        mean=mean,
+        slope_per_hour=slope,
+        spikes=spikes,
+        max_z=max_z,
+        max_z_at=max_z_at,
+        change_at=float(timestamps[change[0]]) if change else None,
+        mean_before=change[1] if change else None,
+        mean_after=change[2] if change else None,
+    )
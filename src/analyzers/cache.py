@@ -0,0 +1,85 @@
+import hashlib
+import math
+import re
+import time
+from collections import OrderedDict
+
+import structlog
+
+from src.core.state import load_json_state, save_json_state
+
+logger = structlog.get_logger()
+
+_VOLATILE_PATTERNS = [
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?"), "<ts>"),
+    (re.compile(r"\b\d{2}:\d{2}:\d{2}(?:\.\d+)?\b"), "<ts>"),
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<id>"),
+    (re.compile(r"\b(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{12,}\b"), "<id>"),
+    (re.compile(r"\b\d{13,}\b"), "<id>"),
+]
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?")
+
+
+def _bucket(match: re.Match[str]) -> str:
+    value = float(match.group())
+    if value == 0 or not math.isfinite(value):
+        return match.group()
+    magnitude = abs(value)
+    if magnitude <= 1:
+        return f"{value:.1f}"
+    sign = "-" if value < 0 else ""
+    return f"{sign}~2^{round(math.log2(magnitude))}"
+
+
+def normalize(text: str) -> str:
+    for pattern, replacement in _VOLATILE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return _NUMBER.sub(_bucket, text)
+
+
+def fingerprint(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(normalize(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ReportCache:
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float) -> None:
+        self._path = path
+        self._max_entries = max(1, max_entries)
+        self._ttl = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        for key, entry in load_json_state(path).items():
+            try:
+                self._entries[key] = (float(entry["at"]), str(entry["report"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created_at, report = entry
+        if time.time() - created_at > self._ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return report
+
+    def put(self, key: str, report: str) -> None:
+        self._entries[key] = (time.time(), report)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        try:
+            save_json_state(
+                self._path,
+                {k: {"at": created_at, "report": r} for k, (created_at, r) in self._entries.items()},
+            )
+        except OSError as e:
+            logger.warning("llm_cache_save_error", path=self._path, error=str(e))
@@ -0,0 +1,98 @@
+from dataclasses import dataclass, field
+
+WORSENED_RATIO = 1.5
+MIN_COUNT_CHANGE = 2.0
+GAUGE_CHANGE_RATIO = 0.2
+MAX_DELTA_ITEMS = 20
+
+Change = tuple[str, str, float, float]
+
+
+@dataclass
+class Snapshot:
+    counts: dict[str, dict[str, float]] = field(default_factory=dict)
+    gauges: dict[str, dict[str, float]] = field(default_factory=dict)
+
+
+@dataclass
+class Delta:
+    new: list[Change] = field(default_factory=list)
+    resolved: list[Change] = field(default_factory=list)
+    worsened: list[Change] = field(default_factory=list)
+    improved: list[Change] = field(default_factory=list)
+    changed: list[Change] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.new or self.resolved or self.worsened or self.improved or self.changed)
+
+
+def _compare_counts(group: str, previous: dict[str, float], current: dict[str, float], delta: Delta) -> None:
+    for item, value in current.items():
+        before = previous.get(item, 0.0)
+        change = (group, item, before, value)
+        if before == 0 and value > 0:
+            delta.new.append(change)
+        elif value >= before * WORSENED_RATIO and value - before >= MIN_COUNT_CHANGE:
+            delta.worsened.append(change)
+        elif before >= value * WORSENED_RATIO and before - value >= MIN_COUNT_CHANGE:
+            delta.improved.append(change)
+        else:
+            delta.unchanged += 1
+    for item, before in previous.items():
+        if item not in current and before > 0:
+            delta.resolved.append((group, item, before, 0.0))
+
+
+def _compare_gauges(group: str, previous: dict[str, float], current: dict[str, float], delta: Delta) -> None:
+    for item, value in current.items():
+        if item not in previous:
+            delta.new.append((group, item, 0.0, value))
+            continue
+        before = previous[item]
+        if abs(value - before) > GAUGE_CHANGE_RATIO * max(abs(before), abs(value), 1e-9):
+            delta.changed.append((group, item, before, value))
+        else:
+            delta.unchanged += 1
+
+
+def compute_delta(previous: Snapshot, current: Snapshot) -> Delta:
+    delta = Delta()
+    for group, values in current.counts.items():
+        if group in previous.counts:
+            _compare_counts(group, previous.counts[group], values, delta)
+    for group, values in current.gauges.items():
+        if group in previous.gauges:
+            _compare_gauges(group, previous.gauges[group], values, delta)
+    return delta
+
+
+def _format_value(value: float) -> str:
+    return f"{value:g}" if abs(value) < 1e6 else f"{value:.3g}"
+
+
+def _render_changes(title: str, changes: list[Change], with_previous: bool) -> list[str]:
+    if not changes:
+        return []
+    ranked = sorted(changes, key=lambda c: abs(c[3] - c[2]), reverse=True)
+    lines = [f"{title} ({len(changes)}):"]
+    for group, item, before, value in ranked[:MAX_DELTA_ITEMS]:
+        shown = f"{_format_value(before)} -> {_format_value(value)}" if with_previous else _format_value(value)
+        lines.append(f"  [{group}] {item}: {shown}")
+    if len(changes) > MAX_DELTA_ITEMS:
+        lines.append(f"  ... and {len(changes) - MAX_DELTA_ITEMS} more")
+    return lines
+
+
+def render_delta(delta: Delta) -> str:
+    if delta.is_empty:
+        return f"No changes since the previous report; {delta.unchanged} tracked items steady."
+    lines = ["Changes since the previous report:"]
+    lines += _render_changes("New", delta.new, with_previous=False)
+    lines += _render_changes("Worsened", delta.worsened, with_previous=True)
+    lines += _render_changes("Resolved", delta.resolved, with_previous=True)
+    lines += _render_changes("Improved", delta.improved, with_previous=True)
+    lines += _render_changes("Changed metrics", delta.changed, with_previous=True)
+    lines.append(f"Unchanged: {delta.unchanged} tracked items steady.")
+    return "\n".join(lines)
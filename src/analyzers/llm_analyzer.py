@@ -1,14 +1,23 @@
 from __future__ import annotations
 
-import os
+import asyncio
+import contextlib
+import dataclasses
+import functools
 from typing import TYPE_CHECKING
 
 import structlog
-from openai import AsyncOpenAI
 
+from src.analyzers.cache import ReportCache, fingerprint
+from src.analyzers.llm_client import LLMClient
+from src.analyzers.packer import count_tokens, pack_context, split_text
 from src.config import settings
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable
+
+    from openai.types.chat import ChatCompletionMessageParam
+
     from src.sources.base import SourceData
 
 logger = structlog.get_logger()
@@ -43,82 +52,171 @@ Structure your report EXACTLY as follows:
 Be concise. Focus on actionable insights. Skip sections with no relevant data.\
 """
 
+MAP_PROMPT = """\
+You are summarizing one slice of infrastructure monitoring data. \
+Your notes will be merged with notes from other slices into a final status report.
+
+Write terse plain-text notes: affected services, error and warning patterns with counts and time ranges, \
+metric anomalies, and anything that looks unhealthy. Keep exact numbers, service names and error messages. \
+Do not add recommendations or formatting.\
+"""
 
-def _estimate_tokens(text: str) -> int:
-    return len(text) // 4
+REDUCE_PREAMBLE = "The sections below are notes summarized from slices of the raw logs and metrics.\n\n"
 
 
-def _truncate_to_budget(source_data: list[SourceData], max_tokens: int) -> str:
-    sections: list[str] = []
+def _build_fallback_report(source_data: list[SourceData]) -> str:
+    lines = ["<b>Overall Status</b>: ⚠️ LLM unavailable — fallback summary", ""]
     for sd in source_data:
-        sections.append(f"=== {sd.source_name.upper()} ===\nSummary: {sd.summary}\n\n{sd.raw_text}")
+        lines.append(f"<b>{sd.source_name}</b>: {sd.summary}")
+    return "\n".join(lines)
 
-    combined = "\n\n".join(sections)
 
-    if _estimate_tokens(combined) <= max_tokens:
-        return combined
+@functools.cache
+def _report_cache() -> ReportCache:
+    return ReportCache(settings.llm_cache_path, settings.llm_cache_max_entries, settings.llm_cache_ttl)
 
-    # Progressive truncation: halve raw_text per source until it fits
-    for divisor in (2, 4, 8, 16):
-        sections = []
-        for sd in source_data:
-            limit = max(200, len(sd.raw_text) // divisor)
-            truncated_raw = sd.raw_text[:limit] + "\n... (truncated)"
-            sections.append(f"=== {sd.source_name.upper()} ===\nSummary: {sd.summary}\n\n{truncated_raw}")
-        combined = "\n\n".join(sections)
-        if _estimate_tokens(combined) <= max_tokens:
-            return combined
 
-    # Hard character cutoff
-    max_chars = max_tokens * 4
-    return combined[:max_chars] + "\n... (hard truncated)"
+@contextlib.asynccontextmanager
+async def _client_scope(client: LLMClient | None) -> AsyncIterator[LLMClient]:
+    if client is not None:
+        yield client
+        return
+    async with LLMClient() as own_client:
+        yield own_client
 
 
-def _build_fallback_report(source_data: list[SourceData]) -> str:
-    lines = ["<b>Overall Status</b>: ⚠️ LLM unavailable — fallback summary", ""]
-    for sd in source_data:
-        lines.append(f"<b>{sd.source_name}</b>: {sd.summary}")
-    return "\n".join(lines)
+async def _complete(
+    client: LLMClient,
+    messages: list[ChatCompletionMessageParam],
+    model: str,
+    on_token: Callable[[str], None] | None,
+) -> str:
+    if on_token is None:
+        return await client.complete(messages, model=model)
+    parts: list[str] = []
+    async for token in client.stream(messages, model=model):
+        parts.append(token)
+        on_token(token)
+    return "".join(parts)
 
 
-def _build_client() -> AsyncOpenAI:
-    client = AsyncOpenAI(
-        api_key=settings.llm_api_key,
-        base_url=settings.llm_base_url,
-        timeout=60.0,
-    )
+def _map_chunks(source_data: list[SourceData], model: str) -> list[SourceData] | None:
+    if sum(count_tokens(sd.raw_text, model) for sd in source_data) <= settings.llm_max_input_tokens:
+        return None
 
-    if os.getenv("LANGCHAIN_TRACING_V2", "").lower() == "true":
-        try:
-            from langsmith.wrappers import wrap_openai
+    chunks: list[SourceData] = []
+    for sd in source_data:
+        parts = split_text(sd.raw_text, settings.llm_map_chunk_tokens, model) or [sd.raw_text]
+        for i, part in enumerate(parts, 1):
+            chunks.append(
+                dataclasses.replace(
+                    sd,
+                    source_name=sd.source_name if len(parts) == 1 else f"{sd.source_name} part {i}/{len(parts)}",
+                    raw_text=part,
+                    min_share=sd.min_share / len(parts),
+                )
+            )
+
+    limit = max(1, settings.llm_map_max_chunks)
+    if len(chunks) > limit:
+        logger.warning("llm_map_chunks_dropped", chunks=len(chunks), kept=limit)
+        kept = sorted(range(len(chunks)), key=lambda i: -chunks[i].priority)[:limit]
+        chunks = [chunks[i] for i in sorted(kept)]
+    return chunks
+
+
+async def _map(client: LLMClient, semaphore: asyncio.Semaphore, chunk: SourceData, model: str) -> str:
+    content = pack_context([chunk], settings.llm_max_input_tokens, model)
+    async with semaphore:
+        return await client.complete(
+            [
+                {"role": "system", "content": MAP_PROMPT},
+                {"role": "user", "content": content},
+            ],
+            settings.llm_map_max_output_tokens,
+            model=model,
+        )
 
-            client = wrap_openai(client)
-            logger.info("langsmith_tracing_enabled")
-        except ImportError:
-            logger.warning("langsmith_package_not_installed")
 
-    return client
+async def _map_reduce(
+    client: LLMClient,
+    chunks: list[SourceData],
+    model: str,
+    on_token: Callable[[str], None] | None = None,
+) -> str:
+    semaphore = asyncio.Semaphore(max(1, settings.llm_map_concurrency))
+    results = await asyncio.gather(*(_map(client, semaphore, c, model) for c in chunks), return_exceptions=True)
+
+    notes: list[SourceData] = []
+    errors: list[BaseException] = []
+    for chunk, result in zip(chunks, results, strict=True):
+        if isinstance(result, BaseException):
+            logger.warning("llm_map_error", chunk=chunk.source_name, error=str(result))
+            errors.append(result)
+            result = f"(summary unavailable: {result})"
+        notes.append(dataclasses.replace(chunk, raw_text=result))
+    if len(errors) == len(chunks):
+        raise errors[0]
+
+    logger.info("llm_map_complete", chunks=len(chunks), failed=len(errors))
+    user_content = REDUCE_PREAMBLE + pack_context(notes, settings.llm_max_input_tokens, model)
+    return await _complete(
+        client,
+        [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_content},
+        ],
+        model,
+        on_token,
+    )
 
 
-async def analyze(source_data: list[SourceData]) -> str:
+async def analyze(
+    source_data: list[SourceData],
+    client: LLMClient | None = None,
+    on_token: Callable[[str], None] | None = None,
+    model: str | None = None,
+) -> str:
     if not settings.llm_api_key:
         logger.info("llm_api_key_not_set", msg="Using fallback summary")
         return _build_fallback_report(source_data)
 
-    user_content = _truncate_to_budget(source_data, settings.llm_max_input_tokens)
+    model = model or settings.llm_model
+    chunks = _map_chunks(source_data, model) if settings.llm_map_reduce_enabled else None
+    if chunks is not None:
+        prompt = MAP_PROMPT + SYSTEM_PROMPT
+        user_content = "\n\n".join(f"=== {c.source_name.upper()} ===\n{c.summary}\n{c.raw_text}" for c in chunks)
+    else:
+        prompt = SYSTEM_PROMPT
+        user_content = pack_context(source_data, settings.llm_max_input_tokens, model)
+
+    cache_key = fingerprint(model, prompt, user_content) if settings.llm_cache_enabled else None
+    if cache_key is not None:
+        cached = _report_cache().get(cache_key)
+        if cached is not None:
+            logger.info("llm_cache_hit", key=cache_key[:12])
+            if on_token is not None:
+                on_token(cached)
+            return cached
 
     try:
-        client = _build_client()
-        response = await client.chat.completions.create(
-            model=settings.llm_model,
-            max_tokens=settings.llm_max_output_tokens,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_content},
-            ],
-        )
-        content = response.choices[0].message.content or ""
-        return content
+        async with _client_scope(client) as llm:
+            if chunks is not None:
+                content = await _map_reduce(llm, chunks, model, on_token)
+            else:
+                content = await _complete(
+                    llm,
+                    [
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": user_content},
+                    ],
+                    model,
+                    on_token,
+                )
     except Exception as e:
         logger.error("llm_analysis_error", error=str(e))
         return _build_fallback_report(source_data)
+
+    if cache_key is not None and content:
+        _report_cache().put(cache_key, content)
+    return content
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Self
+
+import openai
+import structlog
+from openai import AsyncOpenAI
+
+from src.analyzers.usage import UsageTracker, usage_tracker
+from src.config import settings
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable
+    from types import TracebackType
+
+    from openai.types.chat import ChatCompletionMessageParam
+
+logger = structlog.get_logger()
+
+LATENCY_WINDOW = 50
+MIN_LATENCY_SAMPLES = 5
+
+
+def _build_openai(api_key: str, base_url: str) -> AsyncOpenAI:
+    client = AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        timeout=settings.llm_request_timeout,
+        max_retries=0,
+    )
+
+    if os.getenv("LANGCHAIN_TRACING_V2", "").lower() == "true":
+        try:
+            from langsmith.wrappers import wrap_openai
+
+            client = wrap_openai(client)
+            logger.info("langsmith_tracing_enabled")
+        except ImportError:
+            logger.warning("langsmith_package_not_installed")
+
+    return client
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, openai.APIConnectionError)
+
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(settings.llm_retry_max_delay, settings.llm_retry_base_delay * 2**attempt))
+
+
+class LLMClient:
+    def __init__(self, usage: UsageTracker | None = None) -> None:
+        self._usage = usage or usage_tracker
+        self._primary = _build_openai(settings.llm_api_key, settings.llm_base_url)
+        self._hedge: AsyncOpenAI | None = None
+        if settings.llm_hedge_model or settings.llm_hedge_base_url:
+            self._hedge = _build_openai(
+                settings.llm_hedge_api_key or settings.llm_api_key,
+                settings.llm_hedge_base_url or settings.llm_base_url,
+            )
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._limit = asyncio.Semaphore(max(1, settings.scheduler_max_concurrent_llm_calls))
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._primary.close()
+        if self._hedge is not None:
+            await self._hedge.close()
+
+    def hedge_delay(self) -> float:
+        if len(self._latencies) < MIN_LATENCY_SAMPLES:
+            return settings.llm_hedge_min_delay
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(settings.llm_hedge_percentile * len(ordered)))
+        return max(settings.llm_hedge_min_delay, ordered[index])
+
+    async def _retrying[T](self, model: str, request: Callable[[str], Awaitable[T]]) -> tuple[str, T]:
+        attempt = 0
+        while True:
+            admitted = self._usage.admit(model)
+            try:
+                return admitted, await request(admitted)
+            except Exception as e:
+                if attempt >= settings.llm_max_retries or not _is_retryable(e):
+                    raise
+                delay = _backoff(attempt)
+                logger.warning("llm_retry", model=model, attempt=attempt + 1, delay=round(delay, 2), error=str(e))
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _call(
+        self,
+        client: AsyncOpenAI,
+        model: str,
+        messages: list[ChatCompletionMessageParam],
+        max_tokens: int,
+        record: bool = False,
+    ) -> str:
+        started = time.monotonic()
+        model, response = await self._retrying(
+            model,
+            lambda admitted: client.chat.completions.create(model=admitted, max_tokens=max_tokens, messages=messages),
+        )
+        if record:
+            self._latencies.append(time.monotonic() - started)
+        self._usage.record(model, response.usage)
+        return response.choices[0].message.content or ""
+
+    async def _hedged(
+        self,
+        hedge: AsyncOpenAI,
+        model: str,
+        messages: list[ChatCompletionMessageParam],
+        max_tokens: int,
+    ) -> str:
+        pending = {asyncio.create_task(self._call(self._primary, model, messages, max_tokens, record=True))}
+        hedged = False
+        errors: list[BaseException] = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=None if hedged else self.hedge_delay(),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    errors.append(error)
+                if not hedged:
+                    hedged = True
+                    hedge_model = settings.llm_hedge_model or model
+                    logger.info("llm_hedge_started", model=hedge_model, primary_failed=bool(errors))
+                    pending.add(asyncio.create_task(self._call(hedge, hedge_model, messages, max_tokens)))
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        raise errors[-1]
+
+    async def complete(
+        self,
+        messages: list[ChatCompletionMessageParam],
+        max_tokens: int | None = None,
+        model: str | None = None,
+    ) -> str:
+        async with self._limit:
+            return await self._complete(messages, max_tokens or settings.llm_max_output_tokens, model)
+
+    async def _complete(self, messages: list[ChatCompletionMessageParam], limit: int, model: str | None) -> str:
+        model = model or settings.llm_model
+        async with asyncio.timeout(settings.llm_total_timeout):
+            if self._hedge is None:
+                return await self._call(self._primary, model, messages, limit, record=True)
+            return await self._hedged(self._hedge, model, messages, limit)
+
+    async def stream(
+        self,
+        messages: list[ChatCompletionMessageParam],
+        max_tokens: int | None = None,
+        model: str | None = None,
+    ) -> AsyncIterator[str]:
+        async with self._limit:
+            async for token in self._stream(messages, max_tokens or settings.llm_max_output_tokens, model):
+                yield token
+
+    async def _stream(
+        self, messages: list[ChatCompletionMessageParam], limit: int, model: str | None
+    ) -> AsyncIterator[str]:
+        deadline = asyncio.get_running_loop().time() + settings.llm_total_timeout
+        async with asyncio.timeout_at(deadline):
+            model, response = await self._retrying(
+                model or settings.llm_model,
+                lambda admitted: self._primary.chat.completions.create(
+                    model=admitted,
+                    max_tokens=limit,
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                ),
+            )
+        chunks = aiter(response)
+        try:
+            while True:
+                async with asyncio.timeout_at(deadline):
+                    try:
+                        chunk = await anext(chunks)
+                    except StopAsyncIteration:
+                        return
+                if chunk.usage is not None:
+                    self._usage.record(model, chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await response.close()
@@ -0,0 +1,85 @@
+import re
+from dataclasses import dataclass
+
+WILDCARD = "<*>"
+
+_VARIABLE_PATTERN = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"
+    r"|\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"
+    r"|\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"
+    r"|\b0x[0-9a-fA-F]+\b"
+    r"|\b[0-9a-fA-F]{16,}\b"
+    r"|\b\d+(?:\.\d+)?\b"
+)
+
+
+def _mask(line: str) -> list[str]:
+    return _VARIABLE_PATTERN.sub(WILDCARD, line).split()
+
+
+def _has_digits(token: str) -> bool:
+    return any(c.isdigit() for c in token)
+
+
+@dataclass
+class LogTemplate:
+    tokens: list[str]
+    sample: str
+    labels: str
+    first_ts: int
+    last_ts: int
+    count: int = 1
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def similarity(self, tokens: list[str]) -> float:
+        matches = sum(1 for a, b in zip(self.tokens, tokens, strict=True) if a == b and a != WILDCARD)
+        return matches / len(tokens) if tokens else 1.0
+
+    def merge(self, tokens: list[str], ts: int) -> None:
+        self.tokens = [a if a == b else WILDCARD for a, b in zip(self.tokens, tokens, strict=True)]
+        self.count += 1
+        self.first_ts = min(self.first_ts, ts)
+        self.last_ts = max(self.last_ts, ts)
+
+
+class TemplateMiner:
+    def __init__(self, depth: int = 4, similarity: float = 0.5, max_children: int = 100) -> None:
+        self._prefix_len = max(1, depth - 2)
+        self._similarity = similarity
+        self._max_children = max_children
+        self._tree: dict[int, dict[tuple[str, ...], list[LogTemplate]]] = {}
+        self._templates: list[LogTemplate] = []
+
+    def _prefix(self, tokens: list[str], children: dict[tuple[str, ...], list[LogTemplate]]) -> tuple[str, ...]:
+        prefix = tuple(WILDCARD if _has_digits(t) else t for t in tokens[: self._prefix_len])
+        if prefix not in children and len(children) >= self._max_children:
+            return (WILDCARD,) * len(prefix)
+        return prefix
+
+    def add(self, line: str, ts: int, labels: str = "") -> LogTemplate:
+        tokens = _mask(line)
+        children = self._tree.setdefault(len(tokens), {})
+        clusters = children.setdefault(self._prefix(tokens, children), [])
+
+        best: LogTemplate | None = None
+        best_score = -1.0
+        for cluster in clusters:
+            score = cluster.similarity(tokens)
+            if score > best_score:
+                best, best_score = cluster, score
+
+        if best is not None and best_score >= self._similarity:
+            best.merge(tokens, ts)
+            return best
+
+        template = LogTemplate(tokens=tokens, sample=line, labels=labels, first_ts=ts, last_ts=ts)
+        clusters.append(template)
+        self._templates.append(template)
+        return template
+
+    @property
+    def templates(self) -> list[LogTemplate]:
+        return sorted(self._templates, key=lambda t: (-t.count, -t.last_ts))
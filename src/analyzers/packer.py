@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import structlog
+import tiktoken
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from src.sources.base import SourceData
+
+logger = structlog.get_logger()
+
+CHARS_PER_TOKEN = 4
+FALLBACK_ENCODING = "o200k_base"
+TRUNCATION_MARKER = "\n... (truncated)"
+SECTION_SEPARATOR = "\n\n"
+
+
+_encodings: dict[str, tiktoken.Encoding] = {}
+
+
+def _encoding_name(model: str) -> str:
+    try:
+        return tiktoken.encoding_name_for_model(model.rsplit("/", 1)[-1])
+    except KeyError:
+        return FALLBACK_ENCODING
+
+
+def _encoding(model: str) -> tiktoken.Encoding | None:
+    return _encodings.get(_encoding_name(model))
+
+
+async def load_encodings(models: Iterable[str], timeout: float) -> None:
+    for name in {_encoding_name(model) for model in models} - _encodings.keys():
+        try:
+            async with asyncio.timeout(timeout):
+                _encodings[name] = await asyncio.to_thread(tiktoken.get_encoding, name)
+        except (OSError, ValueError, TimeoutError) as e:
+            logger.warning("tokenizer_unavailable", encoding=name, error=str(e) or type(e).__name__)
+
+
+@dataclass
+class _Tokenized:
+    text: str
+    tokens: list[int] | None
+
+    @property
+    def size(self) -> int:
+        return len(self.tokens) if self.tokens is not None else -(-len(self.text) // CHARS_PER_TOKEN)
+
+    def head(self, limit: int, encoding: tiktoken.Encoding | None) -> str:
+        if self.tokens is not None and encoding is not None:
+            cut = encoding.decode(self.tokens[:limit])
+        else:
+            cut = self.text[: limit * CHARS_PER_TOKEN]
+        newline = cut.rfind("\n")
+        if newline > len(cut) // 2:
+            cut = cut[:newline]
+        return cut
+
+
+def _tokenize(text: str, encoding: tiktoken.Encoding | None) -> _Tokenized:
+    return _Tokenized(text, encoding.encode(text, disallowed_special=()) if encoding is not None else None)
+
+
+def count_tokens(text: str, model: str) -> int:
+    return _tokenize(text, _encoding(model)).size
+
+
+def pack_context(source_data: Sequence[SourceData], max_tokens: int, model: str) -> str:
+    encoding = _encoding(model)
+    headers = [
+        _tokenize(f"=== {sd.source_name.upper()} ===\nSummary: {sd.summary}\n\n", encoding) for sd in source_data
+    ]
+    bodies = [_tokenize(sd.raw_text, encoding) for sd in source_data]
+    marker_size = _tokenize(TRUNCATION_MARKER, encoding).size
+    separator_size = _tokenize(SECTION_SEPARATOR, encoding).size * max(0, len(source_data) - 1)
+
+    available = max(0, max_tokens - separator_size - sum(h.size for h in headers))
+    if sum(b.size for b in bodies) <= available:
+        return SECTION_SEPARATOR.join(h.text + b.text for h, b in zip(headers, bodies, strict=True))
+
+    reserved = [min(b.size, int(sd.min_share * max_tokens)) for sd, b in zip(source_data, bodies, strict=True)]
+    if sum(reserved) > available:
+        scale = available / sum(reserved)
+        reserved = [int(r * scale) for r in reserved]
+
+    allocated = list(reserved)
+    remaining = available - sum(reserved)
+    for i in sorted(range(len(source_data)), key=lambda i: -source_data[i].priority):
+        extra = min(remaining, bodies[i].size - allocated[i])
+        allocated[i] += extra
+        remaining -= extra
+
+    sections: list[str] = []
+    for header, body, limit in zip(headers, bodies, allocated, strict=True):
+        if limit >= body.size:
+            sections.append(header.text + body.text)
+        else:
+            sections.append(header.text + body.head(max(0, limit - marker_size), encoding) + TRUNCATION_MARKER)
+    return SECTION_SEPARATOR.join(sections)
+
+
+def split_text(text: str, max_tokens: int, model: str) -> list[str]:
+    encoding = _encoding(model)
+    limit = max(1, max_tokens)
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for line in text.splitlines():
+        line_size = _tokenize(line + "\n", encoding).size
+        if line_size > limit:
+            line = _tokenize(line, encoding).head(limit - 1, encoding)
+            line_size = limit
+        if current and size + line_size > limit:
+            chunks.append("\n".join(current))
+            current = []
+            size = 0
+        current.append(line)
+        size += line_size
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
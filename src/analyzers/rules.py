@@ -0,0 +1,103 @@
+import math
+from dataclasses import dataclass, field
+from typing import Literal
+
+from src.config import settings
+from src.sources.base import SourceData
+
+Severity = Literal["healthy", "degraded", "critical", "unknown"]
+
+ERRORS_GROUP_PREFIX = "errors by "
+WARNINGS_GROUP_PREFIX = "warnings by "
+DOWN_SERVICES_GROUP = "down services"
+ERROR_RATE_GROUP_PREFIX = "Error Rate"
+LATENCY_GROUP_PREFIX = "P95 Latency"
+
+_RANK: dict[Severity, int] = {"healthy": 0, "unknown": 1, "degraded": 2, "critical": 3}
+
+
+@dataclass
+class Assessment:
+    severity: Severity = "healthy"
+    findings: list[str] = field(default_factory=list)
+
+    def escalate(self, severity: Severity, finding: str) -> None:
+        if _RANK[severity] > _RANK[self.severity]:
+            self.severity = severity
+        self.findings.append(finding)
+
+
+def _total(groups: dict[str, dict[str, float]], prefix: str) -> float | None:
+    matching = [values for group, values in groups.items() if group.startswith(prefix)]
+    if not matching:
+        return None
+    return sum(sum(values.values()) for values in matching)
+
+
+def _peak(groups: dict[str, dict[str, float]], prefix: str) -> tuple[str, float] | None:
+    series = [
+        (item, value)
+        for group, values in groups.items()
+        if group.startswith(prefix)
+        for item, value in values.items()
+        if math.isfinite(value)
+    ]
+    return max(series, key=lambda s: s[1]) if series else None
+
+
+def assess(source_data: list[SourceData]) -> Assessment:
+    assessment = Assessment()
+    for sd in source_data:
+        snapshot = sd.snapshot
+        if snapshot is None or sd.partial:
+            assessment.escalate("unknown", f"{sd.source_name}: no complete structured data ({sd.summary})")
+            continue
+
+        if sd.source_name == "loki":
+            errors = _total(snapshot.counts, ERRORS_GROUP_PREFIX)
+            warnings = _total(snapshot.counts, WARNINGS_GROUP_PREFIX)
+            if errors is None or warnings is None:
+                assessment.escalate("unknown", "loki: exact log counts unavailable")
+                continue
+            if errors > settings.rules_max_errors:
+                assessment.escalate("degraded", f"loki: {errors:g} errors (threshold {settings.rules_max_errors})")
+            if warnings > settings.rules_max_warnings:
+                assessment.escalate(
+                    "degraded", f"loki: {warnings:g} warnings (threshold {settings.rules_max_warnings})"
+                )
+
+        elif sd.source_name == "prometheus":
+            down = snapshot.counts.get(DOWN_SERVICES_GROUP)
+            if down is None:
+                assessment.escalate("unknown", "prometheus: service status unavailable")
+                continue
+            if down:
+                assessment.escalate("critical", f"prometheus: down services {sorted(down)}")
+            for prefix in (ERROR_RATE_GROUP_PREFIX, LATENCY_GROUP_PREFIX):
+                if not any(group.startswith(prefix) for group in snapshot.gauges):
+                    assessment.escalate("unknown", f"prometheus: {prefix} unavailable")
+            error_rate = _peak(snapshot.gauges, ERROR_RATE_GROUP_PREFIX)
+            if error_rate is not None and error_rate[1] > settings.rules_max_error_rate:
+                assessment.escalate("degraded", f"prometheus: 5xx rate {error_rate[1]:g}/s for {error_rate[0]}")
+            latency = _peak(snapshot.gauges, LATENCY_GROUP_PREFIX)
+            if latency is not None and latency[1] > settings.rules_max_p95_latency:
+                assessment.escalate("degraded", f"prometheus: p95 latency {latency[1]:g}s for {latency[0]}")
+
+        else:
+            assessment.escalate("unknown", f"{sd.source_name}: no rules for this source")
+    return assessment
+
+
+def report_status(report: str) -> Severity:
+    headline = report.split("\n", 1)[0].lower()
+    for severity in ("critical", "degraded", "healthy"):
+        if severity in headline:
+            return severity
+    return "unknown"
+
+
+def render_healthy_report(source_data: list[SourceData]) -> str:
+    lines = ["<b>Overall Status</b>: 🟢 Healthy", "", "<b>Service Health</b>:"]
+    lines.extend(f"- {sd.source_name}: {sd.summary}" for sd in source_data)
+    lines += ["", "<i>All checks within thresholds; generated by rules without the LLM.</i>"]
+    return "\n".join(lines)
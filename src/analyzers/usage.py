@@ -0,0 +1,86 @@
+import time
+from collections import deque
+
+import structlog
+from openai.types import CompletionUsage
+from prometheus_client import Counter
+
+from src.config import settings
+
+logger = structlog.get_logger()
+
+HOUR_SECONDS = 3600
+DAY_SECONDS = 86400
+MINUTE_SECONDS = 60
+
+LLM_TOKENS = Counter("llm_tokens", "LLM tokens used", ["model", "kind"])
+LLM_REQUESTS = Counter("llm_requests", "LLM requests admitted", ["model"])
+LLM_BUDGET_ACTIONS = Counter("llm_budget_actions", "LLM calls downgraded or rejected by budgets", ["action"])
+
+
+class LLMBudgetError(Exception):
+    pass
+
+
+class UsageTracker:
+    def __init__(self) -> None:
+        self._tokens: deque[tuple[float, int]] = deque()
+        self._requests: deque[float] = deque()
+
+    def _prune(self, now: float) -> None:
+        while self._tokens and self._tokens[0][0] <= now - DAY_SECONDS:
+            self._tokens.popleft()
+        while self._requests and self._requests[0] <= now - MINUTE_SECONDS:
+            self._requests.popleft()
+
+    def used(self, window_seconds: int) -> int:
+        since = time.time() - window_seconds
+        return sum(tokens for at, tokens in self._tokens if at > since)
+
+    def _budget_state(self) -> tuple[str | None, str | None]:
+        downgrade: str | None = None
+        for name, window, budget in (
+            ("hourly", HOUR_SECONDS, settings.llm_hourly_token_budget),
+            ("daily", DAY_SECONDS, settings.llm_daily_token_budget),
+        ):
+            if not budget:
+                continue
+            used = self.used(window)
+            if used >= budget:
+                return f"{name} token budget of {budget} used up", None
+            if downgrade is None and used >= budget * settings.llm_budget_fallback_threshold:
+                downgrade = f"{name} token budget of {budget} nearly used up"
+        return None, downgrade
+
+    def admit(self, model: str) -> str:
+        now = time.time()
+        self._prune(now)
+
+        limit = settings.llm_max_requests_per_minute
+        if limit and len(self._requests) >= limit:
+            LLM_BUDGET_ACTIONS.labels(action="reject").inc()
+            raise LLMBudgetError(f"rate limit of {limit} LLM requests per minute reached")
+
+        exhausted, downgrade = self._budget_state()
+        if exhausted is not None:
+            LLM_BUDGET_ACTIONS.labels(action="reject").inc()
+            raise LLMBudgetError(exhausted)
+        fallback = settings.llm_budget_fallback_model
+        if downgrade is not None and fallback and fallback != model:
+            LLM_BUDGET_ACTIONS.labels(action="downgrade").inc()
+            logger.warning("llm_budget_downgrade", reason=downgrade, model=model, fallback_model=fallback)
+            model = fallback
+
+        self._requests.append(now)
+        LLM_REQUESTS.labels(model=model).inc()
+        return model
+
+    def record(self, model: str, usage: CompletionUsage | None) -> None:
+        if usage is None:
+            return
+        LLM_TOKENS.labels(model=model, kind="prompt").inc(usage.prompt_tokens)
+        LLM_TOKENS.labels(model=model, kind="completion").inc(usage.completion_tokens)
+        self._tokens.append((time.time(), usage.total_tokens))
+
+
+usage_tracker = UsageTracker()
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+
+from src.dependencies import AlertCoalescerDep, require_leader
+from src.schemas.alerts import AlertmanagerWebhook, AlertWebhookResponse
+
+router = APIRouter()
+
+
+@router.post("/alerts/alertmanager", status_code=202, dependencies=[Depends(require_leader)])
+async def receive_alertmanager(payload: AlertmanagerWebhook, coalescer: AlertCoalescerDep) -> AlertWebhookResponse:
+    accepted = coalescer.submit(payload.alerts)
+    return AlertWebhookResponse(status="scheduled" if accepted else "ignored", pending=coalescer.pending)
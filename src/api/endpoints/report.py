@@ -1,9 +1,15 @@
 import asyncio
+import json
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 
-from src.dependencies import MonitorDep
-from src.schemas.report import ReportResponse, TriggerResponse
+from src.core.exceptions import AppError
+from src.core.report_store import ReportKind
+from src.dependencies import MonitorDep, ReportStoreDep, require_leader
+from src.schemas.report import ReportHistoryResponse, ReportResponse, StoredReportResponse, TriggerResponse
 
 router = APIRouter()
 
@@ -13,12 +19,68 @@ async def get_last_report(monitor: MonitorDep) -> ReportResponse:
     return ReportResponse(
         report=monitor.last_report,
         generated_at=monitor.last_report_at,
+        partial_report=monitor.partial_report,
+        alert_report=monitor.last_alert_report,
+        alert_report_generated_at=monitor.last_alert_report_at,
     )
 
 
-@router.post("/trigger", status_code=202)
-async def trigger_report(monitor: MonitorDep) -> TriggerResponse:
-    if monitor.running:
-        return TriggerResponse(status="already_running")
-    asyncio.create_task(monitor.tick())
-    return TriggerResponse(status="started")
+@router.get("/reports")
+async def list_reports(
+    monitor: MonitorDep,
+    store: ReportStoreDep,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    status: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    kind: ReportKind | None = None,
+) -> ReportHistoryResponse:
+    try:
+        reports, next_cursor = await asyncio.to_thread(
+            store.query,
+            monitor.name,
+            since.timestamp() if since is not None else None,
+            until.timestamp() if until is not None else None,
+            status,
+            limit,
+            cursor,
+            kind,
+        )
+    except ValueError as e:
+        raise AppError(400, f"Invalid cursor: {cursor}") from e
+    return ReportHistoryResponse(
+        reports=[
+            StoredReportResponse(
+                id=r.id,
+                profile=r.profile,
+                status=r.status,
+                report=r.report,
+                kind=r.kind,
+                generated_at=datetime.fromtimestamp(r.created_at, UTC),
+            )
+            for r in reports
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/report/stream")
+async def stream_report(monitor: MonitorDep) -> StreamingResponse:
+    async def events() -> AsyncIterator[str]:
+        async for event, data in monitor.events():
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.post("/trigger", status_code=202, dependencies=[Depends(require_leader)])
+async def trigger_report(monitor: MonitorDep, response: Response, wait: bool = False) -> TriggerResponse:
+    started = monitor.trigger(stream=True)
+    if not wait:
+        return TriggerResponse(status="started" if started else "already_running")
+    report = await monitor.join()
+    response.status_code = 200
+    if report is None:
+        return TriggerResponse(status="failed")
+    return TriggerResponse(status="completed", report=report, generated_at=monitor.last_report_at)
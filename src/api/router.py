@@ -1,7 +1,8 @@
 from fastapi import APIRouter
 
-from src.api.endpoints import health, report
+from src.api.endpoints import alerts, health, report
 
 router = APIRouter()
 router.include_router(health.router, tags=["health"])
 router.include_router(report.router, tags=["report"])
+router.include_router(alerts.router, tags=["alerts"])
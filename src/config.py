@@ -1,9 +1,29 @@
-from typing import Any
+import re
+from typing import Any, Literal, Self
 
-from pydantic import field_validator
+from pydantic import BaseModel, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class MonitorProfile(BaseModel):
+    name: str
+    jobs: list[str] | None = None
+    monitor_interval: int | None = None
+    lookback_period: int | None = None
+    llm_model: str | None = None
+    telegram_chat_ids: list[str] | None = None
+    loki_extra_queries: list[str] | None = None
+    prometheus_extra_queries: list[str] | None = None
+
+
+DEFAULT_PROFILE = MonitorProfile(name="default")
+PROFILE_NAME_PATTERN = re.compile(r"[\w-]+")
+
+
+def override[T](value: T | None, default: T) -> T:
+    return default if value is None else value
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_prefix="AGENT_MONITORING_",
@@ -21,8 +41,18 @@ class Settings(BaseSettings):
     metrics_enabled: bool = True
 
     # Monitor loop
+    monitor_mode: Literal["embedded", "api"] = "embedded"
+    monitor_poll_interval: float = 10.0
+    worker_metrics_port: int = 9100
     monitor_interval: int = 3600
     lookback_period: int = 3600
+    monitor_fetch_timeout: float = 120.0
+    monitor_delta_enabled: bool = False
+    monitor_profiles: list[MonitorProfile] = []
+    scheduler_max_concurrent_fetches: int = 8
+    scheduler_max_concurrent_llm_calls: int = 4
+    scheduler_slot_spread_seconds: float = 300.0
+    scheduler_queue_size: int = 4
 
     # LLM
     llm_api_key: str = ""
@@ -30,16 +60,84 @@ class Settings(BaseSettings):
     llm_model: str = "google/gemini-2.0-flash"
     llm_max_input_tokens: int = 12000
     llm_max_output_tokens: int = 2000
+    llm_tokenizer_load_timeout: float = 10.0
+    llm_request_timeout: float = 60.0
+    llm_total_timeout: float = 180.0
+    llm_max_retries: int = 3
+    llm_retry_base_delay: float = 1.0
+    llm_retry_max_delay: float = 20.0
+    llm_hedge_model: str = ""
+    llm_hedge_base_url: str = ""
+    llm_hedge_api_key: str = ""
+    llm_hedge_percentile: float = 0.95
+    llm_hedge_min_delay: float = 10.0
+    llm_hourly_token_budget: int = 0
+    llm_daily_token_budget: int = 0
+    llm_max_requests_per_minute: int = 0
+    llm_budget_fallback_model: str = ""
+    llm_budget_fallback_threshold: float = 0.8
+    llm_map_reduce_enabled: bool = False
+    llm_map_chunk_tokens: int = 8000
+    llm_map_concurrency: int = 4
+    llm_map_max_chunks: int = 16
+    llm_map_max_output_tokens: int = 800
+    llm_cache_enabled: bool = False
+    llm_cache_path: str = "state/llm_cache.json"
+    llm_cache_max_entries: int = 64
+    llm_cache_ttl: int = 21600
+
+    # Rule-based fast path
+    rules_fast_path_enabled: bool = False
+    rules_max_errors: int = 0
+    rules_max_warnings: int = 100
+    rules_max_error_rate: float = 0.0
+    rules_max_p95_latency: float = 1.0
+
+    # Report history
+    report_store_enabled: bool = True
+    report_store_path: str = "state/reports.db"
+    report_store_max_age: int = 7776000
+    report_store_max_reports: int = 100000
+
+    # Leader election
+    leader_election_backend: str = ""
+    leader_election_path: str = "state/leader.db"
+    leader_lease_ttl: float = 30.0
+    leader_renew_interval: float = 10.0
+
+    # Alertmanager webhook
+    alerts_debounce_seconds: float = 30.0
+    alerts_lookback_period: int = 900
+    alerts_job_label: str = "job"
 
     # Loki
     loki_url: str = "http://loki:3100"
     loki_enabled: bool = True
     loki_extra_queries: list[str] = []
+    loki_max_concurrency: int = 4
+    loki_incremental: bool = False
+    loki_watermark_path: str = "state/loki_watermarks.json"
+    loki_count_by: str = "job"
+    loki_shard_seconds: int = 3600
+    loki_page_size: int = 100
+    loki_max_lines_per_query: int = 500
+    loki_max_response_bytes: int = 8_000_000
 
     # Prometheus
     prometheus_url: str = "http://prometheus:9090"
     prometheus_enabled: bool = True
     prometheus_extra_queries: list[str] = []
+    prometheus_max_series_per_query: int = 5000
+    prometheus_max_response_bytes: int = 8_000_000
+    prometheus_max_concurrency: int = 4
+    prometheus_range_enabled: bool = False
+    prometheus_range_step: int = 60
+    prometheus_top_k: int = 10
+    prometheus_bottom_k: int = 3
+    prometheus_topk_pushdown: bool = False
+    prometheus_baseline_enabled: bool = False
+    prometheus_baseline_offsets: list[int] = [86400, 604800]
+    prometheus_baseline_bucket_seconds: int = 3600
 
     # Telegram
     telegram_bot_token: str = ""
@@ -52,7 +150,37 @@ class Settings(BaseSettings):
             raise ValueError("monitor_interval must be positive")
         return v
 
-    @field_validator("telegram_chat_ids", "loki_extra_queries", "prometheus_extra_queries", mode="before")
+    @field_validator("monitor_profiles")
+    @classmethod
+    def _validate_monitor_profiles(cls, v: list[MonitorProfile]) -> list[MonitorProfile]:
+        names = [p.name for p in v]
+        if len(set(names)) != len(names):
+            raise ValueError("monitor_profiles names must be unique")
+        if any(not PROFILE_NAME_PATTERN.fullmatch(p.name) for p in v):
+            raise ValueError("monitor_profiles names may only contain letters, digits, '_' and '-'")
+        if any(p.monitor_interval is not None and p.monitor_interval <= 0 for p in v):
+            raise ValueError("monitor_interval must be positive")
+        return v
+
+    @model_validator(mode="after")
+    def _validate_leader_lease(self) -> Self:
+        if self.leader_renew_interval >= self.leader_lease_ttl:
+            raise ValueError("leader_renew_interval must be shorter than leader_lease_ttl")
+        return self
+
+    @model_validator(mode="after")
+    def _validate_monitor_mode(self) -> Self:
+        if self.monitor_mode == "api" and not self.report_store_enabled:
+            raise ValueError("monitor_mode=api serves reports from the report store, which must be enabled")
+        return self
+
+    @field_validator(
+        "telegram_chat_ids",
+        "loki_extra_queries",
+        "prometheus_extra_queries",
+        "prometheus_baseline_offsets",
+        mode="before",
+    )
     @classmethod
     def _parse_comma_separated(cls, v: Any) -> list[str]:
         if isinstance(v, str):
@@ -0,0 +1,141 @@
+import contextlib
+import sqlite3
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+ReportKind = Literal["full", "alert"]
+
+MMAP_SIZE = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    profile TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    report TEXT NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'full'
+);
+CREATE INDEX IF NOT EXISTS idx_reports_profile_time ON reports (profile, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_reports_profile_status_time ON reports (profile, status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_reports_time ON reports (created_at);
+"""
+
+
+@dataclass(frozen=True)
+class StoredReport:
+    id: int
+    profile: str
+    created_at: float
+    status: str
+    report: str
+    kind: str = "full"
+
+
+def encode_cursor(report: StoredReport) -> str:
+    return f"{report.created_at!r}:{report.id}"
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    created_at, _, report_id = cursor.partition(":")
+    return float(created_at), int(report_id)
+
+
+class ReportStore:
+    def __init__(self, path: str, max_age: int = 0, max_reports: int = 0) -> None:
+        self._path = path
+        self._max_age = max_age
+        self._max_reports = max_reports
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(reports)")}
+            if "kind" not in columns:
+                conn.execute("ALTER TABLE reports ADD COLUMN kind TEXT NOT NULL DEFAULT 'full'")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_reports_profile_kind_time ON reports (profile, kind, created_at, id)"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._path, timeout=30)
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def append(
+        self,
+        profile: str,
+        status: str,
+        report: str,
+        created_at: float | None = None,
+        kind: ReportKind = "full",
+    ) -> StoredReport:
+        created_at = time.time() if created_at is None else created_at
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO reports (profile, created_at, status, report, kind) VALUES (?, ?, ?, ?, ?)",
+                (profile, created_at, status, report, kind),
+            )
+            self._prune(conn, created_at, profile, kind)
+        return StoredReport(cursor.lastrowid or 0, profile, created_at, status, report, kind)
+
+    def _prune(self, conn: sqlite3.Connection, now: float, profile: str, kind: ReportKind) -> None:
+        if self._max_age:
+            conn.execute("DELETE FROM reports WHERE created_at < ?", (now - self._max_age,))
+        if self._max_reports:
+            conn.execute(
+                "DELETE FROM reports WHERE profile = ? AND kind = ? AND id <= ("
+                "SELECT id FROM reports WHERE profile = ? AND kind = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (profile, kind, profile, kind, self._max_reports),
+            )
+
+    def latest(self, profile: str, kind: ReportKind = "full") -> StoredReport | None:
+        reports, _ = self.query(profile, limit=1, kind=kind)
+        return reports[0] if reports else None
+
+    def query(
+        self,
+        profile: str,
+        since: float | None = None,
+        until: float | None = None,
+        status: str | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+        kind: str | None = None,
+    ) -> tuple[list[StoredReport], str | None]:
+        clauses = ["profile = ?"]
+        params: list[str | float | int] = [profile]
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        if cursor is not None:
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        params.append(limit + 1)
+
+        sql = (
+            "SELECT id, profile, created_at, status, report, kind FROM reports "
+            f"WHERE {' AND '.join(clauses)} ORDER BY created_at DESC, id DESC LIMIT ?"
+        )
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        reports = [StoredReport(*row) for row in rows[:limit]]
+        next_cursor = encode_cursor(reports[-1]) if len(rows) > limit else None
+        return reports, next_cursor
@@ -2,11 +2,46 @@ from typing import Annotated
 
 from fastapi import Depends, Request
 
+from src.config import settings
+from src.core.exceptions import AppError
+from src.core.report_store import ReportStore
+from src.services.alerts import AlertCoalescer
 from src.services.monitor import AgentMonitor
 
 
-def get_monitor(request: Request) -> AgentMonitor:
-    return request.app.state.monitor  # type: ignore[no-any-return]
+def get_monitor(request: Request, profile: str | None = None) -> AgentMonitor:
+    if profile is None:
+        return request.app.state.monitor  # type: ignore[no-any-return]
+    monitors: dict[str, AgentMonitor] = getattr(request.app.state, "monitors", {})
+    if profile not in monitors:
+        raise AppError(404, f"Unknown profile: {profile}")
+    return monitors[profile]
 
 
 MonitorDep = Annotated[AgentMonitor, Depends(get_monitor)]
+
+
+def get_alert_coalescer(request: Request, monitor: MonitorDep) -> AlertCoalescer:
+    coalescers: dict[str, AlertCoalescer] = request.app.state.alert_coalescers
+    return coalescers[monitor.name]
+
+
+AlertCoalescerDep = Annotated[AlertCoalescer, Depends(get_alert_coalescer)]
+
+
+def get_report_store(request: Request) -> ReportStore:
+    store: ReportStore | None = getattr(request.app.state, "report_store", None)
+    if store is None:
+        raise AppError(404, "Report history is disabled")
+    return store
+
+
+ReportStoreDep = Annotated[ReportStore, Depends(get_report_store)]
+
+
+def require_leader(request: Request) -> None:
+    if settings.monitor_mode == "api":
+        raise AppError(503, "Monitor runs happen in the worker process")
+    elector = getattr(request.app.state, "elector", None)
+    if elector is not None and not elector.is_leader:
+        raise AppError(503, "This replica is not the leader; monitor runs happen on the leader")
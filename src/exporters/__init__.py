@@ -1,3 +1,4 @@
+from src.config import DEFAULT_PROFILE, MonitorProfile
 from src.exporters.base import BaseExporter
 from src.exporters.telegram import TelegramExporter
 
@@ -6,10 +7,10 @@ ALL_EXPORTERS: list[type[BaseExporter]] = [
 ]
 
 
-def get_configured_exporters() -> list[BaseExporter]:
+def get_configured_exporters(profile: MonitorProfile = DEFAULT_PROFILE) -> list[BaseExporter]:
     exporters: list[BaseExporter] = []
     for cls in ALL_EXPORTERS:
-        instance = cls()
+        instance = cls(profile)
         if instance.is_configured():
             exporters.append(instance)
     return exporters
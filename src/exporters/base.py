@@ -1,9 +1,14 @@
 from abc import ABC, abstractmethod
 
+from src.config import DEFAULT_PROFILE, MonitorProfile
+
 
 class BaseExporter(ABC):
     name: str
 
+    def __init__(self, profile: MonitorProfile = DEFAULT_PROFILE) -> None:
+        self.profile = profile
+
     @abstractmethod
     def is_configured(self) -> bool: ...
 
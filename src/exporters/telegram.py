@@ -3,7 +3,7 @@ from datetime import UTC, datetime
 import httpx
 import structlog
 
-from src.config import settings
+from src.config import override, settings
 from src.exporters.base import BaseExporter
 
 logger = structlog.get_logger()
@@ -59,8 +59,12 @@ def _format_messages(report: str) -> list[str]:
 class TelegramExporter(BaseExporter):
     name = "telegram"
 
+    @property
+    def chat_ids(self) -> list[str]:
+        return override(self.profile.telegram_chat_ids, settings.telegram_chat_ids)
+
     def is_configured(self) -> bool:
-        return bool(settings.telegram_bot_token and settings.telegram_chat_ids)
+        return bool(settings.telegram_bot_token and self.chat_ids)
 
     async def export(self, report: str) -> None:
         if not self.is_configured():
@@ -70,7 +74,7 @@ class TelegramExporter(BaseExporter):
         base = TG_API.format(token=settings.telegram_bot_token)
 
         async with httpx.AsyncClient(timeout=15) as client:
-            for chat_id in settings.telegram_chat_ids:
+            for chat_id in self.chat_ids:
                 for text in messages:
                     await self._send(client, base, chat_id, text)
 
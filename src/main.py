@@ -1,62 +1,63 @@
 import asyncio
 import contextlib
-import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
 import structlog
 from fastapi import FastAPI
 
+from src.analyzers.llm_client import LLMClient
 from src.api.router import router
 from src.config import settings
 from src.core.exceptions import register_exception_handlers
+from src.core.logging_config import configure_logging
 from src.core.middleware import register_middleware
-from src.exporters import get_configured_exporters
-from src.services.monitor import AgentMonitor
-from src.sources import get_configured_sources
+from src.services.alerts import AlertCoalescer
+from src.services.leader import LeaderElector, get_lease_backend
+from src.services.runner import build_report_store, load_tokenizers, poll_reports, refresh_reports, run_monitors
+from src.services.scheduler import build_monitors
 
 logger = structlog.get_logger()
 
 
-def configure_logging() -> None:
-    log_level: int = getattr(logging, settings.log_level.upper())
-    structlog.configure(
-        processors=[
-            structlog.contextvars.merge_contextvars,
-            structlog.processors.add_log_level,
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.dev.ConsoleRenderer() if settings.debug else structlog.processors.JSONRenderer(),
-        ],
-        wrapper_class=structlog.make_filtering_bound_logger(log_level),
-        context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
-        cache_logger_on_first_use=True,
-    )
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     configure_logging()
     logger.info("startup", app_name=settings.app_name)
 
-    sources = get_configured_sources()
-    exporters = get_configured_exporters()
-    logger.info(
-        "monitor_starting",
-        sources=[s.name for s in sources],
-        exporters=[e.name for e in exporters],
-    )
-
-    monitor = AgentMonitor(sources=sources, exporters=exporters)
-    app.state.monitor = monitor
-    monitor_task = asyncio.create_task(monitor.run())
+    store = build_report_store()
+    llm_client: LLMClient | None = None
+    if settings.monitor_mode == "api":
+        monitors = build_monitors(store=store, readonly=True)
+    else:
+        llm_client = LLMClient()
+        monitors = build_monitors(llm_client, store)
+        await load_tokenizers(monitors)
+    await refresh_reports(monitors)
+    logger.info("monitor_starting", mode=settings.monitor_mode, profiles=[m.name for m in monitors])
+
+    app.state.report_store = store
+    app.state.monitor = monitors[0]
+    app.state.monitors = {m.name: m for m in monitors}
+    app.state.alert_coalescers = {m.name: AlertCoalescer(m) for m in monitors}
+
+    app.state.elector = None
+    if settings.monitor_mode == "api":
+        monitor_task = asyncio.create_task(poll_reports(monitors))
+    else:
+        lease_backend = get_lease_backend()
+        app.state.elector = LeaderElector(lease_backend) if lease_backend is not None else None
+        monitor_task = asyncio.create_task(run_monitors(monitors, app.state.elector))
 
     yield
 
     monitor_task.cancel()
     with contextlib.suppress(asyncio.CancelledError):
         await monitor_task
+    for coalescer in app.state.alert_coalescers.values():
+        await coalescer.aclose()
+    if llm_client is not None:
+        await llm_client.aclose()
     logger.info("shutdown", app_name=settings.app_name)
 
 
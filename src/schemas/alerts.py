@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+
+class Alert(BaseModel):
+    status: str = "firing"
+    labels: dict[str, str] = {}
+    annotations: dict[str, str] = {}
+    fingerprint: str = ""
+
+
+class AlertmanagerWebhook(BaseModel):
+    status: str = "firing"
+    alerts: list[Alert] = []
+
+
+class AlertWebhookResponse(BaseModel):
+    status: str
+    pending: int
@@ -6,7 +6,26 @@ from pydantic import BaseModel
 class ReportResponse(BaseModel):
     report: str | None
     generated_at: datetime | None
+    partial_report: str | None = None
+    alert_report: str | None = None
+    alert_report_generated_at: datetime | None = None
 
 
 class TriggerResponse(BaseModel):
     status: str
+    report: str | None = None
+    generated_at: datetime | None = None
+
+
+class StoredReportResponse(BaseModel):
+    id: int
+    profile: str
+    status: str
+    report: str
+    kind: str
+    generated_at: datetime
+
+
+class ReportHistoryResponse(BaseModel):
+    reports: list[StoredReportResponse]
+    next_cursor: str | None = None
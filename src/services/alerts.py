@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from typing import TYPE_CHECKING
+
+import structlog
+
+from src.config import settings
+from src.sources.base import SourceData
+
+if TYPE_CHECKING:
+    from src.schemas.alerts import Alert
+    from src.services.monitor import AgentMonitor
+
+logger = structlog.get_logger()
+
+MAX_ALERT_LINES = 50
+SECTION_PRIORITY = 3
+SECTION_MIN_SHARE = 0.1
+
+
+def _alert_key(alert: Alert) -> str:
+    return alert.fingerprint or ",".join(f"{k}={v}" for k, v in sorted(alert.labels.items()))
+
+
+def alert_jobs(alerts: list[Alert]) -> list[str] | None:
+    jobs = {alert.labels.get(settings.alerts_job_label) for alert in alerts}
+    if None in jobs:
+        return None
+    return sorted(job for job in jobs if job) or None
+
+
+def render_alerts(alerts: list[Alert]) -> SourceData:
+    lines = [f"Firing alerts that triggered this report (lookback {settings.alerts_lookback_period}s):"]
+    for alert in alerts[:MAX_ALERT_LINES]:
+        name = alert.labels.get("alertname", "unknown")
+        labels = ", ".join(f"{k}={v}" for k, v in sorted(alert.labels.items()) if k != "alertname")
+        summary = alert.annotations.get("summary") or alert.annotations.get("description", "")
+        lines.append(f"- {name} [{labels}] {summary}".rstrip())
+    if len(alerts) > MAX_ALERT_LINES:
+        lines.append(f"... and {len(alerts) - MAX_ALERT_LINES} more")
+    return SourceData(
+        source_name="alertmanager",
+        summary=f"{len(alerts)} firing alerts",
+        raw_text="\n".join(lines),
+        priority=SECTION_PRIORITY,
+        min_share=SECTION_MIN_SHARE,
+    )
+
+
+class AlertCoalescer:
+    def __init__(self, monitor: AgentMonitor) -> None:
+        self._monitor = monitor
+        self._pending: dict[str, Alert] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(self, alerts: list[Alert]) -> bool:
+        firing = [alert for alert in alerts if alert.status == "firing"]
+        if not firing:
+            return False
+        for alert in firing:
+            self._pending[_alert_key(alert)] = alert
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return True
+
+    async def _run(self) -> None:
+        while self._pending:
+            await asyncio.sleep(settings.alerts_debounce_seconds)
+            batch, self._pending = self._pending, {}
+            alerts = list(batch.values())
+            jobs = alert_jobs(alerts)
+            try:
+                await self._monitor.targeted_tick(jobs, [render_alerts(alerts)])
+            except Exception as e:
+                logger.error("alert_tick_error", profile=self._monitor.name, jobs=jobs, error=str(e))
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
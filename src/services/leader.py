@@ -0,0 +1,140 @@
+import asyncio
+import contextlib
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable, Coroutine
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from src.config import settings
+
+logger = structlog.get_logger()
+
+LEASE_NAME = "monitor"
+SCHEMA = "CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL)"
+
+
+class LeaseBackend(ABC):
+    name: str
+
+    @abstractmethod
+    def acquire(self, lease: str, holder: str, ttl: float) -> bool: ...
+
+    @abstractmethod
+    def release(self, lease: str, holder: str) -> None: ...
+
+
+class SQLiteLeaseBackend(LeaseBackend):
+    name = "sqlite"
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with contextlib.closing(sqlite3.connect(path, timeout=5)) as conn, conn:
+            conn.execute(SCHEMA)
+
+    def acquire(self, lease: str, holder: str, ttl: float) -> bool:
+        now = time.time()
+        with contextlib.closing(sqlite3.connect(self._path, timeout=5)) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at "
+                "WHERE leases.holder = excluded.holder OR leases.expires_at < ?",
+                (lease, holder, now + ttl, now),
+            )
+            return cursor.rowcount == 1
+
+    def release(self, lease: str, holder: str) -> None:
+        with contextlib.closing(sqlite3.connect(self._path, timeout=5)) as conn, conn:
+            conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (lease, holder))
+
+
+LEASE_BACKENDS: dict[str, Callable[[], LeaseBackend]] = {
+    SQLiteLeaseBackend.name: lambda: SQLiteLeaseBackend(settings.leader_election_path),
+}
+
+
+def get_lease_backend() -> LeaseBackend | None:
+    backend = settings.leader_election_backend
+    if not backend:
+        return None
+    if backend not in LEASE_BACKENDS:
+        raise ValueError(f"Unknown leader election backend: {backend}")
+    return LEASE_BACKENDS[backend]()
+
+
+class LeaderElector:
+    def __init__(self, backend: LeaseBackend, holder: str | None = None) -> None:
+        self._backend = backend
+        self._holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._renewed_at: float | None = None
+
+    @property
+    def holder(self) -> str:
+        return self._holder
+
+    @property
+    def is_leader(self) -> bool:
+        return self._remaining() > 0
+
+    def _remaining(self) -> float:
+        if self._renewed_at is None:
+            return 0.0
+        return self._renewed_at + settings.leader_lease_ttl - asyncio.get_running_loop().time()
+
+    async def _renew(self) -> bool:
+        started = asyncio.get_running_loop().time()
+        remaining = self._remaining()
+        try:
+            async with asyncio.timeout(remaining if remaining > 0 else settings.leader_lease_ttl):
+                acquired = await asyncio.to_thread(
+                    self._backend.acquire, LEASE_NAME, self._holder, settings.leader_lease_ttl
+                )
+        except Exception as e:
+            logger.warning("leader_lease_error", backend=self._backend.name, error=str(e) or type(e).__name__)
+            return self.is_leader
+        self._renewed_at = started if acquired else None
+        return acquired
+
+    async def _step_down(self, leading: asyncio.Task[None]) -> None:
+        logger.warning("leader_lost", holder=self._holder)
+        leading.cancel()
+        await asyncio.wait({leading})
+
+    async def run(
+        self,
+        lead: Callable[[], Coroutine[Any, Any, None]],
+        follow: Callable[[], Awaitable[None]],
+    ) -> None:
+        leading: asyncio.Task[None] | None = None
+        try:
+            while True:
+                if await self._renew():
+                    if leading is None:
+                        logger.info("leader_elected", holder=self._holder)
+                        leading = asyncio.create_task(lead())
+                else:
+                    if leading is not None:
+                        await self._step_down(leading)
+                        leading = None
+                    await follow()
+                if leading is None:
+                    await asyncio.sleep(settings.leader_renew_interval)
+                    continue
+                await asyncio.sleep(max(0.0, min(settings.leader_renew_interval, self._remaining())))
+                if not self.is_leader:
+                    await self._step_down(leading)
+                    leading = None
+        finally:
+            if leading is not None:
+                leading.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await leading
+                with contextlib.suppress(Exception):
+                    await asyncio.to_thread(self._backend.release, LEASE_NAME, self._holder)
@@ -1,27 +1,66 @@
 import asyncio
+import dataclasses
+from collections.abc import AsyncIterator
 from datetime import UTC, datetime
 
 import structlog
 
-from src.analyzers import llm_analyzer
-from src.config import settings
+from src.analyzers import llm_analyzer, rules
+from src.analyzers.delta import Snapshot, compute_delta, render_delta
+from src.analyzers.llm_client import LLMClient
+from src.config import DEFAULT_PROFILE, MonitorProfile, override, settings
+from src.core.report_store import ReportKind, ReportStore
 from src.exporters.base import BaseExporter
 from src.sources.base import BaseSource, SourceData
 
 logger = structlog.get_logger()
 
+FETCH_GRACE_SECONDS = 2.0
+
 
 class AgentMonitor:
     def __init__(
         self,
         sources: list[BaseSource],
         exporters: list[BaseExporter],
+        llm_client: LLMClient | None = None,
+        profile: MonitorProfile = DEFAULT_PROFILE,
+        fetch_limit: asyncio.Semaphore | None = None,
+        store: ReportStore | None = None,
     ) -> None:
         self._sources = sources
         self._exporters = exporters
+        self._llm_client = llm_client
+        self._profile = profile
+        self._fetch_limit = fetch_limit or asyncio.Semaphore(1)
+        self._store = store
         self._last_report: str | None = None
         self._last_report_at: datetime | None = None
-        self._running = False
+        self._partial_report: str | None = None
+        self._last_alert_report: str | None = None
+        self._last_alert_report_at: datetime | None = None
+        self._listeners: set[asyncio.Queue[tuple[str, str]]] = set()
+        self._snapshots: dict[str, Snapshot] = {}
+        self._inflight: asyncio.Future[str | None] | None = None
+        self._inflight_since: float | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._export_lock = asyncio.Lock()
+
+    @property
+    def name(self) -> str:
+        return self._profile.name
+
+    @property
+    def interval(self) -> int:
+        return override(self._profile.monitor_interval, settings.monitor_interval)
+
+    @property
+    def lookback(self) -> int:
+        return override(self._profile.lookback_period, settings.lookback_period)
+
+    @property
+    def model(self) -> str:
+        return override(self._profile.llm_model, settings.llm_model)
 
     @property
     def last_report(self) -> str | None:
@@ -31,25 +70,112 @@ class AgentMonitor:
     def last_report_at(self) -> datetime | None:
         return self._last_report_at
 
+    @property
+    def last_alert_report(self) -> str | None:
+        return self._last_alert_report
+
+    @property
+    def last_alert_report_at(self) -> datetime | None:
+        return self._last_alert_report_at
+
+    @property
+    def partial_report(self) -> str | None:
+        return self._partial_report
+
     @property
     def running(self) -> bool:
-        return self._running
+        return self._inflight is not None
+
+    @property
+    def running_since(self) -> float | None:
+        return self._inflight_since
 
-    async def _fetch_all(self) -> list[SourceData]:
-        tasks = {s.name: s.fetch(settings.lookback_period) for s in self._sources}
-        gathered = await asyncio.gather(*tasks.values(), return_exceptions=True)
+    async def _fetch_all(self, lookback: int | None = None, jobs: list[str] | None = None) -> list[SourceData]:
+        lookback = override(lookback, self.lookback)
+        timeout = settings.monitor_fetch_timeout
+        async with self._fetch_limit:
+            deadline = asyncio.get_running_loop().time() + timeout
+            tasks = {
+                s.name: asyncio.wait_for(s.fetch(lookback, deadline, jobs=jobs), timeout + FETCH_GRACE_SECONDS)
+                for s in self._sources
+            }
+            gathered = await asyncio.gather(*tasks.values(), return_exceptions=True)
 
         results: list[SourceData] = []
         for name, result in zip(tasks.keys(), gathered, strict=True):
-            if isinstance(result, BaseException):
+            if isinstance(result, TimeoutError):
+                logger.warning("source_fetch_timeout", source=name, timeout=timeout)
+                results.append(
+                    SourceData(source_name=name, summary=f"Timed out after {timeout:g}s", raw_text="", partial=True)
+                )
+            elif isinstance(result, BaseException):
                 logger.warning("source_fetch_error", source=name, error=str(result))
                 results.append(SourceData(source_name=name, summary=f"Error: {result}", raw_text=""))
             else:
+                if result.partial:
+                    logger.warning("source_fetch_partial", source=name)
                 results.append(result)
         return results
 
-    async def _analyze(self, source_data: list[SourceData]) -> str:
-        return await llm_analyzer.analyze(source_data)
+    def _apply_delta(self, source_data: list[SourceData]) -> list[SourceData]:
+        results: list[SourceData] = []
+        for sd in source_data:
+            if sd.snapshot is None or sd.partial:
+                results.append(sd)
+                continue
+            previous = self._snapshots.get(sd.source_name)
+            self._snapshots[sd.source_name] = sd.snapshot
+            if previous is None:
+                results.append(sd)
+                continue
+            delta = compute_delta(previous, sd.snapshot)
+            logger.info(
+                "source_delta",
+                source=sd.source_name,
+                new=len(delta.new),
+                worsened=len(delta.worsened),
+                resolved=len(delta.resolved),
+                unchanged=delta.unchanged,
+            )
+            results.append(dataclasses.replace(sd, raw_text=render_delta(delta)))
+        return results
+
+    def _publish(self, event: str, data: str) -> None:
+        for queue in self._listeners:
+            queue.put_nowait((event, data))
+
+    def _on_token(self, token: str) -> None:
+        self._partial_report = (self._partial_report or "") + token
+        self._publish("token", token)
+
+    async def events(self) -> AsyncIterator[tuple[str, str]]:
+        if self._partial_report is None:
+            if self._last_report is not None:
+                yield "report", self._last_report
+            return
+        queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        self._listeners.add(queue)
+        try:
+            yield "partial", self._partial_report
+            while True:
+                event, data = await queue.get()
+                yield event, data
+                if event in ("report", "error"):
+                    return
+        finally:
+            self._listeners.discard(queue)
+
+    async def _analyze(self, source_data: list[SourceData], stream: bool = False) -> str:
+        on_token = self._on_token if stream else None
+        if settings.rules_fast_path_enabled:
+            assessment = rules.assess(source_data)
+            logger.info("rules_assessment", severity=assessment.severity, findings=assessment.findings)
+            if assessment.severity == "healthy":
+                report = rules.render_healthy_report(source_data)
+                if on_token is not None:
+                    on_token(report)
+                return report
+        return await llm_analyzer.analyze(source_data, self._llm_client, on_token, self.model)
 
     async def _export_all(self, report: str) -> None:
         for exporter in self._exporters:
@@ -58,22 +184,114 @@ class AgentMonitor:
             except Exception as e:
                 logger.error("exporter_error", exporter=exporter.name, error=str(e))
 
-    async def tick(self) -> None:
-        self._running = True
+    async def _record(self, report: str, generated_at: datetime, kind: ReportKind = "full") -> None:
+        if self._store is None:
+            return
+        try:
+            await asyncio.to_thread(
+                self._store.append, self.name, rules.report_status(report), report, generated_at.timestamp(), kind
+            )
+        except Exception as e:
+            logger.warning("report_store_error", profile=self.name, error=str(e))
+
+    async def refresh(self) -> None:
+        if self._store is None:
+            return
         try:
-            source_data = await self._fetch_all()
-            report = await self._analyze(source_data)
-            self._last_report = report
-            self._last_report_at = datetime.now(UTC)
+            stored = await asyncio.to_thread(self._store.latest, self.name)
+        except Exception as e:
+            logger.warning("report_store_error", profile=self.name, error=str(e))
+            return
+        if stored is None:
+            return
+        if self._last_report_at is None or stored.created_at > self._last_report_at.timestamp():
+            self._last_report = stored.report
+            self._last_report_at = datetime.fromtimestamp(stored.created_at, UTC)
+
+    def begin(self, stream: bool = False) -> bool:
+        if self._inflight is not None:
+            return False
+        loop = asyncio.get_running_loop()
+        self._inflight = loop.create_future()
+        self._inflight_since = loop.time()
+        if stream:
+            self._partial_report = ""
+        return True
+
+    def end(self) -> None:
+        inflight, self._inflight = self._inflight, None
+        self._inflight_since = None
+        if inflight is not None and not inflight.done():
+            inflight.set_result(None)
+        if self._partial_report is not None:
+            self._partial_report = None
+            self._publish("error", "report generation failed")
+
+    async def fetch(self) -> list[SourceData]:
+        source_data = await self._fetch_all()
+        if settings.monitor_delta_enabled:
+            source_data = self._apply_delta(source_data)
+        return source_data
+
+    async def analyze(self, source_data: list[SourceData]) -> str:
+        stream = self._partial_report is not None
+        report = await self._analyze(source_data, stream)
+        self._last_report = report
+        self._last_report_at = datetime.now(UTC)
+        await self._record(report, self._last_report_at)
+        if self._inflight is not None and not self._inflight.done():
+            self._inflight.set_result(report)
+        if stream:
+            self._partial_report = None
+            self._publish("report", report)
+        return report
+
+    async def export(self, report: str) -> None:
+        async with self._export_lock:
             await self._export_all(report)
-            logger.info("monitor_tick_complete", sources=[s.source_name for s in source_data])
+        logger.info("monitor_tick_complete", profile=self.name)
+
+    async def join(self) -> str | None:
+        if self._inflight is None:
+            return self._last_report
+        return await asyncio.shield(self._inflight)
+
+    async def _run(self) -> str:
+        try:
+            source_data = await self.fetch()
+            report = await self.analyze(source_data)
         finally:
-            self._running = False
+            self.end()
+        await self.export(report)
+        return report
 
-    async def run(self) -> None:
-        while True:
-            try:
-                await self.tick()
-            except Exception as e:
-                logger.error("monitor_loop_error", error=str(e))
-            await asyncio.sleep(settings.monitor_interval)
+    async def _run_logged(self) -> None:
+        try:
+            await self._run()
+        except Exception as e:
+            logger.error("monitor_tick_error", profile=self.name, error=str(e))
+
+    async def tick(self, stream: bool = False) -> str | None:
+        if not self.begin(stream):
+            logger.info("monitor_tick_joined", profile=self.name)
+            return await self.join()
+        return await self._run()
+
+    def trigger(self, stream: bool = False) -> bool:
+        if not self.begin(stream):
+            logger.info("monitor_tick_joined", profile=self.name)
+            return False
+        task = asyncio.create_task(self._run_logged())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def targeted_tick(self, jobs: list[str] | None, context: list[SourceData]) -> str:
+        logger.info("monitor_targeted_tick", profile=self.name, jobs=jobs)
+        source_data = await self._fetch_all(settings.alerts_lookback_period, jobs)
+        report = await self._analyze([*context, *source_data])
+        self._last_alert_report = report
+        self._last_alert_report_at = datetime.now(UTC)
+        await self._record(report, self._last_alert_report_at, kind="alert")
+        await self.export(report)
+        return report
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import structlog
+
+from src.analyzers.packer import load_encodings
+from src.config import settings
+from src.core.report_store import ReportStore
+from src.services.scheduler import MonitorScheduler
+
+if TYPE_CHECKING:
+    from src.services.leader import LeaderElector
+    from src.services.monitor import AgentMonitor
+
+logger = structlog.get_logger()
+
+
+def build_report_store() -> ReportStore | None:
+    if not settings.report_store_enabled:
+        return None
+    return ReportStore(settings.report_store_path, settings.report_store_max_age, settings.report_store_max_reports)
+
+
+async def load_tokenizers(monitors: list[AgentMonitor]) -> None:
+    models = {m.model for m in monitors} | {settings.llm_hedge_model, settings.llm_budget_fallback_model}
+    await load_encodings((m for m in models if m), settings.llm_tokenizer_load_timeout)
+
+
+async def refresh_reports(monitors: list[AgentMonitor]) -> None:
+    for monitor in monitors:
+        await monitor.refresh()
+
+
+async def poll_reports(monitors: list[AgentMonitor]) -> None:
+    while True:
+        await refresh_reports(monitors)
+        await asyncio.sleep(settings.monitor_poll_interval)
+
+
+async def run_monitors(monitors: list[AgentMonitor], elector: LeaderElector | None = None) -> None:
+    if elector is None:
+        await MonitorScheduler(monitors).run()
+        return
+    logger.info("leader_election_enabled", backend=settings.leader_election_backend, holder=elector.holder)
+    await elector.run(lambda: MonitorScheduler(monitors).run(), lambda: refresh_reports(monitors))
@@ -0,0 +1,161 @@
+import asyncio
+import heapq
+import math
+import time
+import zlib
+from collections.abc import Coroutine
+from typing import TYPE_CHECKING, Any
+
+import structlog
+
+from src.analyzers.llm_client import LLMClient
+from src.config import DEFAULT_PROFILE, MonitorProfile, settings
+from src.core.report_store import ReportStore
+from src.exporters import get_configured_exporters
+from src.services.monitor import AgentMonitor
+from src.sources import get_configured_sources
+
+if TYPE_CHECKING:
+    from src.sources.base import SourceData
+
+logger = structlog.get_logger()
+
+SLOT_RETRY_SECONDS = 5.0
+
+
+def build_monitors(
+    llm_client: LLMClient | None = None,
+    store: ReportStore | None = None,
+    readonly: bool = False,
+) -> list[AgentMonitor]:
+    profiles: list[MonitorProfile] = settings.monitor_profiles or [DEFAULT_PROFILE]
+    fetch_limit = asyncio.Semaphore(max(1, settings.scheduler_max_concurrent_fetches))
+    monitors: list[AgentMonitor] = []
+    for profile in profiles:
+        sources = [] if readonly else get_configured_sources(profile)
+        exporters = [] if readonly else get_configured_exporters(profile)
+        logger.info(
+            "monitor_profile_configured",
+            profile=profile.name,
+            sources=[s.name for s in sources],
+            exporters=[e.name for e in exporters],
+        )
+        monitors.append(
+            AgentMonitor(
+                sources=sources,
+                exporters=exporters,
+                llm_client=llm_client,
+                profile=profile,
+                fetch_limit=fetch_limit,
+                store=store,
+            )
+        )
+    return monitors
+
+
+def next_aligned(interval: float, now: float, offset: float = 0.0) -> float:
+    return (math.floor((now - offset) / interval) + 1) * interval + offset
+
+
+def slot_offset(name: str, interval: float) -> float:
+    spread = min(max(0.0, settings.scheduler_slot_spread_seconds), interval)
+    return zlib.crc32(name.encode()) % 1000 / 1000 * spread
+
+
+class MonitorScheduler:
+    def __init__(self, monitors: list[AgentMonitor]) -> None:
+        self._monitors = monitors
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._begun: set[AgentMonitor] = set()
+        queue_size = max(1, settings.scheduler_queue_size)
+        self._analyze_queue: asyncio.Queue[tuple[AgentMonitor, list[SourceData]]] = asyncio.Queue(queue_size)
+        self._export_queues: dict[AgentMonitor, asyncio.Queue[str]] = {}
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _end(self, monitor: AgentMonitor) -> None:
+        self._begun.discard(monitor)
+        monitor.end()
+
+    async def _fetch(self, monitor: AgentMonitor) -> None:
+        try:
+            source_data = await monitor.fetch()
+        except Exception as e:
+            logger.error("monitor_loop_error", profile=monitor.name, stage="fetch", error=str(e))
+            self._end(monitor)
+            return
+        await self._analyze_queue.put((monitor, source_data))
+
+    async def _analyze_worker(self) -> None:
+        while True:
+            monitor, source_data = await self._analyze_queue.get()
+            try:
+                report = await monitor.analyze(source_data)
+            except Exception as e:
+                logger.error("monitor_loop_error", profile=monitor.name, stage="analyze", error=str(e))
+                continue
+            finally:
+                self._end(monitor)
+                self._analyze_queue.task_done()
+            self._enqueue_export(monitor, report)
+
+    def _enqueue_export(self, monitor: AgentMonitor, report: str) -> None:
+        queue = self._export_queues.get(monitor)
+        if queue is None:
+            queue = self._export_queues[monitor] = asyncio.Queue(max(1, settings.scheduler_queue_size))
+            self._spawn(self._export_chain(monitor, queue))
+        if queue.full():
+            queue.get_nowait()
+            logger.warning("monitor_export_dropped", profile=monitor.name, reason="export backlog full")
+        queue.put_nowait(report)
+
+    async def _export_chain(self, monitor: AgentMonitor, queue: asyncio.Queue[str]) -> None:
+        while True:
+            report = await queue.get()
+            try:
+                await monitor.export(report)
+            except Exception as e:
+                logger.error("monitor_loop_error", profile=monitor.name, stage="export", error=str(e))
+
+    def _next_due(self, loop: asyncio.AbstractEventLoop, monitor: AgentMonitor) -> float:
+        now = time.time()
+        offset = slot_offset(monitor.name, monitor.interval)
+        return loop.time() + next_aligned(monitor.interval, now, offset) - now
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        for _ in range(max(1, settings.scheduler_max_concurrent_llm_calls)):
+            self._spawn(self._analyze_worker())
+
+        now = loop.time()
+        heap = [(now, index, monitor) for index, monitor in enumerate(self._monitors)]
+        heapq.heapify(heap)
+        try:
+            while heap:
+                due, index, monitor = heap[0]
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                next_due = self._next_due(loop, monitor)
+                if not monitor.begin():
+                    started = monitor.running_since
+                    if started is not None and started < next_due - 2 * monitor.interval:
+                        logger.warning("monitor_tick_deferred", profile=monitor.name, reason="previous tick overran")
+                        heapq.heapreplace(heap, (loop.time() + SLOT_RETRY_SECONDS, index, monitor))
+                    else:
+                        logger.info("monitor_tick_skipped", profile=monitor.name, reason="covered by running tick")
+                        heapq.heapreplace(heap, (next_due, index, monitor))
+                    continue
+                heapq.heapreplace(heap, (next_due, index, monitor))
+                self._begun.add(monitor)
+                self._spawn(self._fetch(monitor))
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            for monitor in list(self._begun):
+                self._end(monitor)
@@ -1,3 +1,4 @@
+from src.config import DEFAULT_PROFILE, MonitorProfile
 from src.sources.base import BaseSource
 from src.sources.loki import LokiSource
 from src.sources.prometheus import PrometheusSource
@@ -8,10 +9,10 @@ ALL_SOURCES: list[type[BaseSource]] = [
 ]
 
 
-def get_configured_sources() -> list[BaseSource]:
+def get_configured_sources(profile: MonitorProfile = DEFAULT_PROFILE) -> list[BaseSource]:
     sources: list[BaseSource] = []
     for cls in ALL_SOURCES:
-        instance = cls()
+        instance = cls(profile)
         if instance.is_configured():
             sources.append(instance)
     return sources
@@ -1,19 +1,82 @@
+import asyncio
+import json
+import re
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Sequence
 from dataclasses import dataclass
 
+from src.analyzers.delta import Snapshot
+from src.config import DEFAULT_PROFILE, MonitorProfile, settings
+
 
 @dataclass
 class SourceData:
     source_name: str
     summary: str
     raw_text: str
+    partial: bool = False
+    priority: int = 0
+    min_share: float = 0.0
+    snapshot: Snapshot | None = None
 
 
 class BaseSource(ABC):
     name: str
 
+    def __init__(self, profile: MonitorProfile = DEFAULT_PROFILE) -> None:
+        self.profile = profile
+
+    def scope(self, jobs: list[str] | None) -> list[str] | None:
+        profile_jobs = self.profile.jobs
+        if not jobs or not profile_jobs:
+            return jobs or profile_jobs
+        return [job for job in jobs if job in profile_jobs] or profile_jobs
+
     @abstractmethod
     def is_configured(self) -> bool: ...
 
     @abstractmethod
-    async def fetch(self, lookback_seconds: int) -> SourceData: ...
+    async def fetch(
+        self,
+        lookback_seconds: int,
+        deadline: float | None = None,
+        jobs: list[str] | None = None,
+    ) -> SourceData: ...
+
+
+def job_matcher(jobs: list[str]) -> str:
+    pattern = "|".join(re.escape(job) for job in jobs)
+    return f"{settings.alerts_job_label}=~{json.dumps(pattern)}"
+
+
+def time_left(deadline: float | None) -> float | None:
+    if deadline is None:
+        return None
+    return max(0.0, deadline - asyncio.get_running_loop().time())
+
+
+async def gather_until[T](
+    aws: Sequence[Awaitable[T]],
+    deadline: float | None,
+) -> tuple[list[T | BaseException], bool]:
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    if not tasks:
+        return [], False
+    try:
+        _, pending = await asyncio.wait(tasks, timeout=time_left(deadline))
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    results: list[T | BaseException] = []
+    for task in tasks:
+        if task in pending or task.cancelled():
+            results.append(TimeoutError("deadline exceeded"))
+        elif (error := task.exception()) is not None:
+            results.append(error)
+        else:
+            results.append(task.result())
+    return results, bool(pending)
@@ -1,75 +1,379 @@
+import asyncio
+import math
 import time
+from datetime import UTC, datetime
+from pathlib import Path
 
 import httpx
 import structlog
 
-from src.config import settings
-from src.sources.base import BaseSource, SourceData
+from src.analyzers.delta import Snapshot
+from src.analyzers.log_templates import LogTemplate, TemplateMiner
+from src.config import DEFAULT_PROFILE, MonitorProfile, override, settings
+from src.core.state import load_json_state, save_json_state
+from src.sources.base import BaseSource, SourceData, gather_until, job_matcher
+from src.sources.streaming import LogEntry, parse_loki_streams
 
 logger = structlog.get_logger()
 
 MAX_LOG_LINE_CHARS = 500
 MAX_ERROR_LOGS = 50
+SHARD_DEADLINE_MARGIN = 0.5
+SECTION_PRIORITY = 1
+SECTION_MIN_SHARE = 0.3
+
+ERROR_LEVELS = "error|ERROR|fatal|FATAL"
+WARNING_LEVELS = "warning|WARNING"
+LEVEL_LABELS = ("level", "detected_level")
+
+
+def _selector(label: str, levels: str, jobs: list[str] | None = None) -> str:
+    matchers = [f'{label}=~"{levels}"']
+    if jobs:
+        matchers.append(job_matcher(jobs))
+    return "{" + ", ".join(matchers) + "}"
+
+
+def _count_query(levels: str, lookback_seconds: int, jobs: list[str] | None = None) -> str:
+    by = settings.loki_count_by
+    return " or ".join(
+        f"sum by ({by}) (count_over_time({_selector(label, levels, jobs)}[{lookback_seconds}s]))"
+        for label in LEVEL_LABELS
+    )
+
+
+def _classify(query: str) -> str | None:
+    lowered = query.lower()
+    if "error" in lowered or "fatal" in lowered:
+        return "error"
+    if "warning" in lowered:
+        return "warning"
+    return None
+
+
+def _sample_evenly(entries: list[LogEntry], budget: int) -> list[LogEntry]:
+    if len(entries) <= budget:
+        return entries
+    step = len(entries) / budget
+    return [entries[int(i * step)] for i in range(budget)]
+
+
+def _format_ts(ts_ns: int) -> str:
+    return datetime.fromtimestamp(ts_ns / 1e9, UTC).strftime("%H:%M:%S")
+
+
+def _render_template(template: LogTemplate) -> str:
+    sample = f"[{template.labels}] {template.sample[:MAX_LOG_LINE_CHARS]}"
+    if template.count == 1:
+        return sample
+    span = f"{_format_ts(template.first_ts)}-{_format_ts(template.last_ts)}"
+    return f"[{template.count}x, {span}] {template.template[:MAX_LOG_LINE_CHARS]}\n  e.g. {sample}"
+
+
+def _render_counts(errors: dict[str, int], warnings: dict[str, int], lookback_seconds: int) -> str:
+    minutes = max(lookback_seconds / 60, 1 / 60)
+    lines = [f"Counts by {settings.loki_count_by} (exact, last {lookback_seconds}s):"]
+    for key in sorted(errors.keys() | warnings.keys(), key=lambda k: (-errors.get(k, 0), -warnings.get(k, 0), k)):
+        err = errors.get(key, 0)
+        warn = warnings.get(key, 0)
+        lines.append(f"  {key}: errors={err} ({err / minutes:.2f}/min), warnings={warn} ({warn / minutes:.2f}/min)")
+    return "\n".join(lines)
 
 
 class LokiSource(BaseSource):
     name = "loki"
 
+    def __init__(self, profile: MonitorProfile = DEFAULT_PROFILE) -> None:
+        super().__init__(profile)
+        self._watermarks: dict[str, int] = {}
+        self._windows: dict[str, list[LogEntry]] = {}
+        if settings.loki_incremental:
+            for query, entry in load_json_state(self._watermark_path).items():
+                try:
+                    self._watermarks[query] = int(entry["watermark"])
+                    self._windows[query] = [(str(ts), str(labels), str(line)) for ts, labels, line in entry["window"]]
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+    @property
+    def _watermark_path(self) -> str:
+        if self.profile.name == DEFAULT_PROFILE.name:
+            return settings.loki_watermark_path
+        path = Path(settings.loki_watermark_path)
+        return str(path.with_name(f"{path.stem}.{self.profile.name}{path.suffix}"))
+
+    async def _save_state(self) -> None:
+        state = {
+            query: {"watermark": str(self._watermarks.get(query, 0)), "window": window}
+            for query, window in self._windows.items()
+        }
+        try:
+            await asyncio.to_thread(save_json_state, self._watermark_path, state)
+        except OSError as e:
+            logger.warning("loki_state_save_error", path=self._watermark_path, error=str(e))
+
     def is_configured(self) -> bool:
         return settings.loki_enabled and bool(settings.loki_url)
 
-    async def fetch(self, lookback_seconds: int) -> SourceData:
+    async def _page(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        query: str,
+        start_ns: int,
+        end_ns: int,
+        limit: int,
+    ) -> list[LogEntry]:
+        params = {
+            "query": query,
+            "start": str(start_ns),
+            "end": str(end_ns),
+            "limit": str(limit),
+            "direction": "backward",
+        }
+        async with (
+            semaphore,
+            client.stream("GET", f"{settings.loki_url}/loki/api/v1/query_range", params=params) as resp,
+        ):
+            resp.raise_for_status()
+            entries, truncated = await parse_loki_streams(resp, limit, settings.loki_max_response_bytes)
+        if truncated and len(entries) < limit:
+            logger.warning("loki_response_too_large", query=query, lines=len(entries))
+        return entries
+
+    async def _query_shard(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        query: str,
+        start_ns: int,
+        end_ns: int,
+        budget: int,
+        deadline: float | None,
+    ) -> tuple[list[LogEntry], bool, bool]:
+        loop = asyncio.get_running_loop()
+        entries: list[LogEntry] = []
+        seen: set[tuple[str, str]] = set()
+        cursor_ns = end_ns
+        overlap = 0
+        while len(entries) < budget and cursor_ns > start_ns:
+            if deadline is not None and loop.time() >= deadline:
+                return entries, True, True
+            limit = min(max(1, settings.loki_page_size), budget - len(entries)) + overlap
+            page = await self._page(client, semaphore, query, start_ns, cursor_ns, limit)
+            fresh = [e for e in page if (e[0], e[2]) not in seen]
+            seen.update((ts, line) for ts, _, line in fresh)
+            entries.extend(fresh[: budget - len(entries)])
+            if len(page) < limit:
+                return entries, False, False
+            oldest_ns = min(int(ts) for ts, _, _ in page)
+            overlap = sum(1 for ts, _, _ in page if int(ts) == oldest_ns)
+            if fresh and oldest_ns + 1 < cursor_ns:
+                cursor_ns = oldest_ns + 1
+            else:
+                cursor_ns, overlap = oldest_ns, 0
+        return entries, False, cursor_ns > start_ns
+
+    async def _query(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        query: str,
+        start_ns: int,
+        end_ns: int,
+        deadline: float | None = None,
+    ) -> tuple[list[LogEntry], bool]:
+        entries, partial, _ = await self._query_range(client, semaphore, query, start_ns, end_ns, deadline)
+        return entries, partial
+
+    async def _query_range(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        query: str,
+        start_ns: int,
+        end_ns: int,
+        deadline: float | None = None,
+    ) -> tuple[list[LogEntry], bool, int]:
+        budget = max(1, settings.loki_max_lines_per_query)
+        shard_ns = max(1, settings.loki_shard_seconds) * 1_000_000_000
+        shard_count = max(1, min(budget, math.ceil((end_ns - start_ns) / shard_ns)))
+        shard_budget = math.ceil(budget / shard_count)
+        bounds = [start_ns + (end_ns - start_ns) * i // shard_count for i in range(shard_count + 1)]
+
+        shard_deadline = None if deadline is None else deadline - SHARD_DEADLINE_MARGIN
+        shards, partial = await gather_until(
+            [
+                self._query_shard(client, semaphore, query, bounds[i], bounds[i + 1], shard_budget, shard_deadline)
+                for i in range(shard_count)
+            ],
+            shard_deadline,
+        )
+        entries: list[LogEntry] = []
+        complete_ns = end_ns
+        for i, shard in enumerate(shards):
+            if isinstance(shard, BaseException):
+                if not isinstance(shard, TimeoutError):
+                    raise shard
+                partial = True
+                complete_ns = min(complete_ns, bounds[i])
+                continue
+            shard_entries, shard_partial, truncated = shard
+            entries.extend(shard_entries)
+            partial = partial or shard_partial
+            if truncated:
+                complete_ns = min(complete_ns, bounds[i])
+        entries.sort(key=lambda e: int(e[0]), reverse=True)
+        return _sample_evenly(entries, budget), partial, complete_ns
+
+    async def _count(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        query: str,
+        end_ns: int,
+    ) -> dict[str, int]:
+        async with semaphore:
+            resp = await client.get(
+                f"{settings.loki_url}/loki/api/v1/query",
+                params={"query": query, "time": str(end_ns)},
+            )
+        resp.raise_for_status()
+        data = resp.json()
+
+        counts: dict[str, int] = {}
+        for series in data.get("data", {}).get("result", []):
+            key = series.get("metric", {}).get(settings.loki_count_by, "unknown")
+            counts[key] = counts.get(key, 0) + int(float(series.get("value", [None, "0"])[1]))
+        return counts
+
+    async def _query_incremental(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        query: str,
+        start_ns: int,
+        end_ns: int,
+        deadline: float | None = None,
+    ) -> tuple[list[LogEntry], bool]:
+        cold = query not in self._windows
+        watermark = 0 if cold else self._watermarks.get(query, 0)
+        query_start_ns = max(start_ns, watermark + 1)
+        fresh: list[LogEntry] = []
+        partial = False
+        complete_ns = end_ns
+        if query_start_ns <= end_ns:
+            fresh, partial, complete_ns = await self._query_range(
+                client, semaphore, query, query_start_ns, end_ns, deadline
+            )
+        if complete_ns < end_ns:
+            self._watermarks[query] = max(watermark, complete_ns - 1)
+        elif fresh:
+            self._watermarks[query] = max(watermark, *(int(ts) for ts, _, _ in fresh))
+
+        window = [e for e in self._windows.get(query, []) if int(e[0]) >= start_ns]
+        known = {(ts, line) for ts, _, line in window}
+        window.extend(e for e in fresh if (e[0], e[2]) not in known)
+        window.sort(key=lambda e: int(e[0]), reverse=True)
+        self._windows[query] = _sample_evenly(window, max(1, settings.loki_max_lines_per_query))
+        return self._windows[query], partial
+
+    async def fetch(
+        self,
+        lookback_seconds: int,
+        deadline: float | None = None,
+        jobs: list[str] | None = None,
+    ) -> SourceData:
         now_ns = int(time.time() * 1e9)
         start_ns = now_ns - int(lookback_seconds * 1e9)
 
+        scope = self.scope(jobs)
         queries = [
-            '{level=~"error|ERROR|fatal|FATAL"}',
-            '{level=~"warning|WARNING"}',
-            '{detected_level=~"error|ERROR|fatal|FATAL"}',
-            '{detected_level=~"warning|WARNING"}',
-            *settings.loki_extra_queries,
+            *(_selector(label, levels, scope) for label in LEVEL_LABELS for levels in (ERROR_LEVELS, WARNING_LEVELS)),
+            *override(self.profile.loki_extra_queries, settings.loki_extra_queries),
         ]
+        count_queries = [_count_query(levels, lookback_seconds, scope) for levels in (ERROR_LEVELS, WARNING_LEVELS)]
+
+        incremental = settings.loki_incremental and jobs is None
+        run_query = self._query_incremental if incremental else self._query
+        semaphore = asyncio.Semaphore(max(1, settings.loki_max_concurrency))
+        async with httpx.AsyncClient(timeout=30) as client:
+            (line_results, lines_partial), (counted, counts_partial) = await asyncio.gather(
+                gather_until(
+                    [run_query(client, semaphore, query, start_ns, now_ns, deadline) for query in queries],
+                    deadline,
+                ),
+                gather_until(
+                    [self._count(client, semaphore, query, now_ns) for query in count_queries],
+                    deadline,
+                ),
+            )
+        partial = lines_partial or counts_partial
+        if incremental:
+            await self._save_state()
 
         sections: list[str] = []
+        snapshot = Snapshot()
         error_count = 0
         warning_count = 0
+        seen: set[tuple[str, str]] = set()
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            for query in queries:
-                try:
-                    resp = await client.get(
-                        f"{settings.loki_url}/loki/api/v1/query_range",
-                        params={
-                            "query": query,
-                            "start": str(start_ns),
-                            "end": str(now_ns),
-                            "limit": str(MAX_ERROR_LOGS),
-                        },
-                    )
-                    resp.raise_for_status()
-                    data = resp.json()
-
-                    lines: list[str] = []
-                    for stream in data.get("data", {}).get("result", []):
-                        labels = stream.get("stream", {})
-                        label_str = ", ".join(f"{k}={v}" for k, v in labels.items())
-                        for _ts, line in stream.get("values", []):
-                            truncated = line[:MAX_LOG_LINE_CHARS]
-                            lines.append(f"[{label_str}] {truncated}")
-
-                    if "error" in query.lower() or "fatal" in query.lower():
-                        error_count += len(lines)
-                    elif "warning" in query.lower():
-                        warning_count += len(lines)
-
-                    if lines:
-                        sections.append(f"Query: {query}\n" + "\n".join(lines[:MAX_ERROR_LOGS]))
-
-                except Exception as e:
-                    logger.warning("loki_query_error", query=query, error=str(e))
-                    sections.append(f"Query: {query}\nError fetching: {e}")
+        for query, result in zip(queries, line_results, strict=True):
+            if isinstance(result, BaseException):
+                logger.warning("loki_query_error", query=query, error=str(result))
+                sections.append(f"Query: {query}\nError fetching: {result}")
+                continue
+
+            entries, query_partial = result
+            partial = partial or query_partial
+            miner = TemplateMiner()
+            line_count = 0
+            for ts, label_str, line in entries:
+                key = (ts, line)
+                if key in seen:
+                    continue
+                seen.add(key)
+                miner.add(line, int(ts), label_str)
+                line_count += 1
+
+            kind = _classify(query)
+            if kind == "error":
+                error_count += line_count
+            elif kind == "warning":
+                warning_count += line_count
+
+            templates = miner.templates[:MAX_ERROR_LOGS]
+            snapshot.counts[f"templates {query}"] = {t.template: float(t.count) for t in templates}
+            rendered = [_render_template(t) for t in templates]
+            if query_partial:
+                rendered.append("... (partial: fetch deadline reached)")
+            if rendered:
+                sections.append(f"Query: {query}\n" + "\n".join(rendered))
+
+        error_counts, warning_counts = counted
+        for query, counts in zip(count_queries, counted, strict=True):
+            if isinstance(counts, BaseException):
+                logger.warning("loki_count_error", query=query, error=str(counts))
+
+        if not isinstance(error_counts, BaseException) and not isinstance(warning_counts, BaseException):
+            error_count = sum(error_counts.values())
+            warning_count = sum(warning_counts.values())
+            snapshot.counts[f"errors by {settings.loki_count_by}"] = {k: float(v) for k, v in error_counts.items()}
+            snapshot.counts[f"warnings by {settings.loki_count_by}"] = {k: float(v) for k, v in warning_counts.items()}
+            if error_count or warning_count:
+                sections.insert(0, _render_counts(error_counts, warning_counts, lookback_seconds))
 
         raw_text = "\n\n".join(sections) if sections else "No log entries found."
         summary = f"Errors: {error_count}, Warnings: {warning_count}"
+        if partial:
+            summary += " (partial: fetch deadline reached)"
 
-        return SourceData(source_name=self.name, summary=summary, raw_text=raw_text)
+        return SourceData(
+            source_name=self.name,
+            summary=summary,
+            raw_text=raw_text,
+            partial=partial,
+            priority=SECTION_PRIORITY,
+            min_share=SECTION_MIN_SHARE,
+            snapshot=snapshot,
+        )
@@ -1,71 +1,413 @@
+import asyncio
+import heapq
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+
 import httpx
+import numpy as np
 import structlog
 
-from src.config import settings
-from src.sources.base import BaseSource, SourceData
+from src.analyzers.anomaly import SeriesStats, series_stats
+from src.analyzers.delta import Snapshot
+from src.config import DEFAULT_PROFILE, MonitorProfile, override, settings
+from src.sources.base import BaseSource, SourceData, gather_until, job_matcher
+from src.sources.streaming import Sample, parse_prometheus_matrix, parse_prometheus_vector
 
 logger = structlog.get_logger()
 
+SERVICE_UP_LABEL = "Service Up"
+
 BUILTIN_QUERIES = [
-    ("Service Up", "up"),
+    (SERVICE_UP_LABEL, "up"),
     ("Request Rate (5m)", "sum(rate(http_requests_total[5m])) by (job)"),
     ("Error Rate 5xx (5m)", "sum(rate(http_requests_total{status=~'5..'}[5m])) by (job)"),
     ("P95 Latency", "histogram_quantile(0.95, sum(rate(http_request_duration_seconds_bucket[5m])) by (le, job))"),
     ("P99 Latency", "histogram_quantile(0.99, sum(rate(http_request_duration_seconds_bucket[5m])) by (le, job))"),
 ]
 
+SCOPED_METRICS = re.compile(r"\b(up|http_requests_total|http_request_duration_seconds_bucket)\b(\{)?")
+
+BASELINE_DEVIATION_RATIO = 2.0
+SECTION_PRIORITY = 2
+SECTION_MIN_SHARE = 0.3
+
+
+@dataclass
+class QueryResult:
+    lines: list[str]
+    down_services: list[str] = field(default_factory=list)
+    values: dict[str, float] = field(default_factory=dict)
+
+
+def _metric_str(metric: dict[str, str]) -> str:
+    return ", ".join(f"{k}={v}" for k, v in metric.items())
+
+
+def _scope(query: str, jobs: list[str] | None) -> str:
+    if not jobs:
+        return query
+    matcher = job_matcher(jobs)
+    return SCOPED_METRICS.sub(lambda m: f"{m[1]}{{{matcher}, " if m[2] else f"{m[1]}{{{matcher}}}", query)
+
+
+def _format_offset(seconds: int) -> str:
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds % size == 0:
+            return f"{seconds // size}{unit}"
+    return f"{seconds}s"
+
+
+def _render_baselines(
+    current: dict[str, dict[str, float]],
+    baselines: dict[str, dict[int, dict[str, float]]],
+) -> tuple[str, int]:
+    offsets = settings.prometheus_baseline_offsets
+    header = ", ".join(f"{_format_offset(o)} ago" for o in offsets)
+    lines = [f"Baseline deviation (current / same time {header}; ! marks >{BASELINE_DEVIATION_RATIO:g}x change):"]
+    deviating = 0
+    for label, values in current.items():
+        for series, value in values.items():
+            if not math.isfinite(value):
+                continue
+            ratios: list[str] = []
+            flagged = False
+            for offset in offsets:
+                base = baselines.get(label, {}).get(offset, {}).get(series)
+                if base is None or not math.isfinite(base):
+                    continue
+                if base == 0:
+                    ratios.append(f"was 0 {_format_offset(offset)} ago")
+                    flagged = flagged or value != 0
+                    continue
+                ratio = value / base
+                ratios.append(f"x{ratio:.2f} vs {_format_offset(offset)}")
+                flagged = flagged or not (1 / BASELINE_DEVIATION_RATIO <= ratio <= BASELINE_DEVIATION_RATIO)
+            if ratios:
+                deviating += int(flagged)
+                lines.append(f" {'!' if flagged else ' '}{label} {series}: {value:.4g} ({', '.join(ratios)})")
+    return "\n".join(lines), deviating
+
+
+def _to_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
+async def _no_samples() -> tuple[list[Sample], bool]:
+    return [], False
+
+
+def _others_line(others: int, total: int, p50: float, p95: float) -> str:
+    return f"  ... {others} other series (p50={p50:.4g}, p95={p95:.4g} across all {total})"
+
+
+def _select_series(scored: list[tuple[float, str]]) -> list[str]:
+    top_k = max(0, settings.prometheus_top_k)
+    bottom_k = max(0, settings.prometheus_bottom_k)
+    if len(scored) <= top_k + bottom_k:
+        return [line for _, line in scored]
+
+    ranked = [(value, i) for i, (value, _) in enumerate(scored) if math.isfinite(value)]
+    top = heapq.nlargest(top_k, ranked)
+    top_idx = {i for _, i in top}
+    bottom = heapq.nsmallest(bottom_k, (r for r in ranked if r[1] not in top_idx))
+    chosen = [i for _, i in top] + [i for _, i in reversed(bottom)]
+
+    lines = [scored[i][1] for i in chosen]
+    values = np.array([value for value, _ in ranked], dtype=np.float64)
+    p50, p95 = (float(p) for p in np.percentile(values, [50, 95])) if values.size else (math.nan, math.nan)
+    lines.append(_others_line(len(scored) - len(chosen), len(scored), p50, p95))
+    return lines
+
+
+def _format_ts(ts: float) -> str:
+    return datetime.fromtimestamp(ts, UTC).strftime("%H:%M")
+
+
+def _render_stats(stats: SeriesStats) -> str:
+    parts = [
+        f"last={stats.last:.4g} min={stats.min:.4g} max={stats.max:.4g} mean={stats.mean:.4g}",
+        f"slope={stats.slope_per_hour:+.3g}/h",
+    ]
+    if stats.change_at is not None:
+        parts.append(f"shift {stats.mean_before:.4g}->{stats.mean_after:.4g} at {_format_ts(stats.change_at)}")
+    if stats.spikes and stats.max_z_at is not None:
+        parts.append(f"{stats.spikes} spikes (max z={stats.max_z:.1f} at {_format_ts(stats.max_z_at)})")
+    return " | ".join(parts)
+
 
 class PrometheusSource(BaseSource):
     name = "prometheus"
 
+    def __init__(self, profile: MonitorProfile = DEFAULT_PROFILE) -> None:
+        super().__init__(profile)
+        self._baselines: dict[tuple[str, int], tuple[int, dict[str, float]]] = {}
+
     def is_configured(self) -> bool:
         return settings.prometheus_enabled and bool(settings.prometheus_url)
 
-    async def fetch(self, lookback_seconds: int) -> SourceData:
+    async def _instant(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        query: str,
+        at: float | None = None,
+    ) -> tuple[list[Sample], bool]:
+        params = {"query": query} if at is None else {"query": query, "time": str(at)}
+        async with (
+            semaphore,
+            client.stream("GET", f"{settings.prometheus_url}/api/v1/query", params=params) as resp,
+        ):
+            resp.raise_for_status()
+            return await parse_prometheus_vector(
+                resp,
+                settings.prometheus_max_series_per_query,
+                settings.prometheus_max_response_bytes,
+            )
+
+    async def _baseline(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        query: str,
+        offset: int,
+        bucket: int,
+    ) -> dict[str, float]:
+        cached = self._baselines.get((query, offset))
+        if cached is not None and cached[0] == bucket:
+            return cached[1]
+        samples, _ = await self._instant(client, semaphore, query, at=bucket - offset)
+        values = {_metric_str(metric): _to_float(value) for metric, value in samples}
+        self._baselines[(query, offset)] = (bucket, values)
+        return values
+
+    async def _query_pushdown(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        query: str,
+    ) -> QueryResult:
+        selectors = [
+            f"{name}({k}, ({query}))"
+            for name, k in (("topk", settings.prometheus_top_k), ("bottomk", settings.prometheus_bottom_k))
+            if k > 0
+        ]
+        stats_query = " or ".join(
+            f'label_replace({expr}, "__stat__", "{name}", "", "")'
+            for name, expr in (
+                ("count", f"count(({query}))"),
+                ("p50", f"quantile(0.5, ({query}))"),
+                ("p95", f"quantile(0.95, ({query}))"),
+            )
+        )
+        selected, stats = await asyncio.gather(
+            self._instant(client, semaphore, " or ".join(selectors)) if selectors else _no_samples(),
+            self._instant(client, semaphore, stats_query),
+            return_exceptions=True,
+        )
+        if isinstance(selected, BaseException):
+            raise selected
+        samples, truncated = selected
+
+        samples.sort(key=lambda s: _to_float(s[1]), reverse=True)
+        lines = [f"  {_metric_str(metric)}: {value}" for metric, value in samples]
+        if isinstance(stats, BaseException):
+            logger.warning("prometheus_stats_error", query=query, error=str(stats))
+        else:
+            stat_samples, stats_truncated = stats
+            truncated = truncated or stats_truncated
+            by_stat = {metric.get("__stat__", ""): _to_float(value) for metric, value in stat_samples}
+            total = int(by_stat.get("count", 0))
+            if total > len(samples):
+                lines.append(
+                    _others_line(
+                        total - len(samples), total, by_stat.get("p50", math.nan), by_stat.get("p95", math.nan)
+                    )
+                )
+        if truncated:
+            lines.append(f"  ... (truncated after {len(samples)} series)")
+        return QueryResult(lines=lines, values={_metric_str(metric): _to_float(value) for metric, value in samples})
+
+    async def _query_instant(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        label: str,
+        query: str,
+    ) -> QueryResult:
+        if settings.prometheus_topk_pushdown and label != SERVICE_UP_LABEL:
+            return await self._query_pushdown(client, semaphore, query)
+
+        samples, truncated = await self._instant(client, semaphore, query)
+
+        scored: list[tuple[float, str]] = []
+        down_services: list[str] = []
+        values: dict[str, float] = {}
+        for metric, value in samples:
+            metric_str = _metric_str(metric)
+            values[metric_str] = _to_float(value)
+            scored.append((values[metric_str], f"  {metric_str}: {value}"))
+
+            if label == SERVICE_UP_LABEL and value == "0":
+                down_services.append(metric.get("job", metric_str))
+
+        lines = _select_series(scored)
+        if truncated:
+            lines.append(f"  ... (truncated after {len(samples)} series)")
+        return QueryResult(lines=lines, down_services=down_services, values=values)
+
+    async def _query_range(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        label: str,
+        query: str,
+        lookback_seconds: int,
+    ) -> QueryResult:
+        end = time.time()
+        params = {
+            "query": query,
+            "start": str(end - lookback_seconds),
+            "end": str(end),
+            "step": str(settings.prometheus_range_step),
+        }
+        async with (
+            semaphore,
+            client.stream("GET", f"{settings.prometheus_url}/api/v1/query_range", params=params) as resp,
+        ):
+            resp.raise_for_status()
+            series, truncated = await parse_prometheus_matrix(
+                resp,
+                settings.prometheus_max_series_per_query,
+                settings.prometheus_max_response_bytes,
+            )
+
+        scored: list[tuple[float, str]] = []
+        down_services: list[str] = []
+        values: dict[str, float] = {}
+        for metric, points in series:
+            metric_str = _metric_str(metric)
+            samples = np.array(points, dtype=np.float64).reshape(-1, 2)
+            stats = series_stats(samples[:, 0], samples[:, 1])
+            if stats is None:
+                scored.append((math.nan, f"  {metric_str}: no finite samples"))
+                continue
+            values[metric_str] = stats.last
+            marker = "!" if stats.is_anomalous else " "
+            scored.append((stats.last, f" {marker}{metric_str}: {_render_stats(stats)}"))
+
+            if label == SERVICE_UP_LABEL and stats.last == 0:
+                down_services.append(metric.get("job", metric_str))
+
+        lines = _select_series(scored)
+        if truncated:
+            lines.append(f"  ... (truncated after {len(series)} series)")
+        return QueryResult(lines=lines, down_services=down_services, values=values)
+
+    async def fetch(
+        self,
+        lookback_seconds: int,
+        deadline: float | None = None,
+        jobs: list[str] | None = None,
+    ) -> SourceData:
         lookback = f"{lookback_seconds}s"
+        range_mode = settings.prometheus_range_enabled
         queries: list[tuple[str, str]] = []
+        scope = self.scope(jobs)
         for label, query in BUILTIN_QUERIES:
-            if "[5m]" in query:
-                query = query.replace("[5m]", f"[{lookback}]")
-            if "5m" in label:
-                label = label.replace("5m", lookback)
+            query = _scope(query, scope)
+            if not range_mode:
+                if "[5m]" in query:
+                    query = query.replace("[5m]", f"[{lookback}]")
+                if "5m" in label:
+                    label = label.replace("5m", lookback)
             queries.append((label, query))
-        for extra in settings.prometheus_extra_queries:
+        baselines_enabled = settings.prometheus_baseline_enabled and jobs is None
+        baseline_queries = queries[1 : len(BUILTIN_QUERIES)] if baselines_enabled else []
+        for extra in override(self.profile.prometheus_extra_queries, settings.prometheus_extra_queries):
             queries.append((extra, extra))
 
-        sections: list[str] = []
-        down_services: list[str] = []
+        bucket_seconds = max(1, settings.prometheus_baseline_bucket_seconds)
+        bucket = int(time.time()) // bucket_seconds * bucket_seconds
+        baseline_keys = [
+            (label, query, offset)
+            for label, query in baseline_queries
+            for offset in settings.prometheus_baseline_offsets
+        ]
 
+        semaphore = asyncio.Semaphore(max(1, settings.prometheus_max_concurrency))
         async with httpx.AsyncClient(timeout=30) as client:
-            for label, query in queries:
-                try:
-                    resp = await client.get(
-                        f"{settings.prometheus_url}/api/v1/query",
-                        params={"query": query},
-                    )
-                    resp.raise_for_status()
-                    data = resp.json()
+            (gathered, partial), (baselined, _) = await asyncio.gather(
+                gather_until(
+                    [
+                        self._query_range(client, semaphore, label, query, lookback_seconds)
+                        if range_mode
+                        else self._query_instant(client, semaphore, label, query)
+                        for label, query in queries
+                    ],
+                    deadline,
+                ),
+                gather_until(
+                    [self._baseline(client, semaphore, query, offset, bucket) for _, query, offset in baseline_keys],
+                    deadline,
+                ),
+            )
+
+        sections: list[str] = []
+        down_services: list[str] = []
+        current: dict[str, dict[str, float]] = {}
+        snapshot = Snapshot()
+        for (label, query), result in zip(queries, gathered, strict=True):
+            if isinstance(result, BaseException):
+                logger.warning("prometheus_query_error", query=query, error=str(result))
+                sections.append(f"{label} ({query}):\n  Error: {result}")
+                continue
 
-                    results = data.get("data", {}).get("result", [])
-                    lines: list[str] = []
-                    for result in results:
-                        metric = result.get("metric", {})
-                        value = result.get("value", [None, None])
-                        metric_str = ", ".join(f"{k}={v}" for k, v in metric.items())
-                        lines.append(f"  {metric_str}: {value[1]}")
+            down_services.extend(result.down_services)
+            current[label] = result.values
+            snapshot.gauges[label] = result.values
+            if label == SERVICE_UP_LABEL:
+                snapshot.counts["down services"] = {service: 1.0 for service in result.down_services}
+            sections.append(f"{label} ({query}):\n" + ("\n".join(result.lines) if result.lines else "  no data"))
 
-                        if label == "Service Up" and value[1] == "0":
-                            job = metric.get("job", metric_str)
-                            down_services.append(job)
+        baselines: dict[str, dict[int, dict[str, float]]] = {}
+        for (label, query, offset), baseline in zip(baseline_keys, baselined, strict=True):
+            if isinstance(baseline, BaseException):
+                logger.warning("prometheus_baseline_error", query=query, offset=offset, error=str(baseline))
+                continue
+            baselines.setdefault(label, {})[offset] = baseline
 
-                    section = f"{label} ({query}):\n" + ("\n".join(lines) if lines else "  no data")
-                    sections.append(section)
+        deviating = 0
+        if baselines:
+            comparable = {label: current[label] for label in baselines if label in current}
+            baseline_text, deviating = _render_baselines(comparable, baselines)
+            sections.insert(0, baseline_text)
 
-                except Exception as e:
-                    logger.warning("prometheus_query_error", query=query, error=str(e))
-                    sections.append(f"{label} ({query}):\n  Error: {e}")
+        if range_mode:
+            sections.insert(
+                0,
+                f"Range stats over {lookback} at {settings.prometheus_range_step}s step "
+                "(! marks spikes above 3 sigma or a level shift):",
+            )
 
         raw_text = "\n\n".join(sections)
         summary = f"Down services: {down_services}" if down_services else "All services up"
+        if deviating:
+            summary += f"; {deviating} series >{BASELINE_DEVIATION_RATIO:g}x off baseline"
+        if partial:
+            summary += " (partial: fetch deadline reached)"
 
-        return SourceData(source_name=self.name, summary=summary, raw_text=raw_text)
+        return SourceData(
+            source_name=self.name,
+            summary=summary,
+            raw_text=raw_text,
+            partial=partial,
+            priority=SECTION_PRIORITY,
+            min_share=SECTION_MIN_SHARE,
+            snapshot=snapshot,
+        )
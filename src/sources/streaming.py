@@ -0,0 +1,129 @@
+from collections.abc import AsyncIterator
+
+import httpx
+import ijson  # type: ignore[import-untyped]
+
+LogEntry = tuple[str, str, str]
+Sample = tuple[dict[str, str], str]
+RangeSeries = tuple[dict[str, str], list[tuple[float, float]]]
+
+
+class ResponseTooLargeError(Exception):
+    pass
+
+
+class _BoundedBody:
+    def __init__(self, chunks: AsyncIterator[bytes], max_bytes: int) -> None:
+        self._chunks = chunks
+        self._remaining = max_bytes
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            return b""
+        if self._remaining <= 0:
+            raise ResponseTooLargeError
+        try:
+            chunk = await anext(self._chunks)
+        except StopAsyncIteration:
+            return b""
+        self._remaining -= len(chunk)
+        return chunk
+
+
+async def parse_loki_streams(response: httpx.Response, limit: int, max_bytes: int) -> tuple[list[LogEntry], bool]:
+    entries: list[LogEntry] = []
+    pending: list[tuple[str, str]] = []
+    labels: dict[str, str] = {}
+    label_key = ""
+    pair: list[str] = []
+    truncated = False
+
+    def flush() -> None:
+        label_str = ", ".join(f"{k}={v}" for k, v in labels.items())
+        entries.extend((ts, label_str, line) for ts, line in pending)
+        pending.clear()
+
+    try:
+        async for prefix, event, value in ijson.parse_async(_BoundedBody(response.aiter_bytes(), max_bytes)):
+            if prefix == "data.result.item" and event == "start_map":
+                labels = {}
+            elif prefix == "data.result.item.stream" and event == "map_key":
+                label_key = value
+            elif prefix.startswith("data.result.item.stream.") and event == "string":
+                labels[label_key] = value
+            elif prefix == "data.result.item.values.item" and event == "start_array":
+                if len(entries) + len(pending) >= limit:
+                    truncated = True
+                    break
+                pair = []
+            elif prefix == "data.result.item.values.item.item" and event == "string" and len(pair) < 2:
+                pair.append(value)
+            elif prefix == "data.result.item.values.item" and event == "end_array" and len(pair) == 2:
+                pending.append((pair[0], pair[1]))
+            elif prefix == "data.result.item" and event == "end_map":
+                flush()
+    except ResponseTooLargeError:
+        truncated = True
+    flush()
+    return entries, truncated
+
+
+async def parse_prometheus_vector(response: httpx.Response, limit: int, max_bytes: int) -> tuple[list[Sample], bool]:
+    samples: list[Sample] = []
+    metric: dict[str, str] = {}
+    metric_key = ""
+    value: str | None = None
+    truncated = False
+
+    try:
+        async for prefix, event, item in ijson.parse_async(_BoundedBody(response.aiter_bytes(), max_bytes)):
+            if prefix == "data.result.item" and event == "start_map":
+                if len(samples) >= limit:
+                    truncated = True
+                    break
+                metric = {}
+                value = None
+            elif prefix == "data.result.item.metric" and event == "map_key":
+                metric_key = item
+            elif prefix.startswith("data.result.item.metric.") and event == "string":
+                metric[metric_key] = item
+            elif prefix == "data.result.item.value.item" and event == "string":
+                value = item
+            elif prefix == "data.result.item" and event == "end_map":
+                samples.append((metric, value if value is not None else ""))
+    except ResponseTooLargeError:
+        truncated = True
+    return samples, truncated
+
+
+async def parse_prometheus_matrix(
+    response: httpx.Response, limit: int, max_bytes: int
+) -> tuple[list[RangeSeries], bool]:
+    series: list[RangeSeries] = []
+    metric: dict[str, str] = {}
+    metric_key = ""
+    points: list[tuple[float, float]] = []
+    timestamp = 0.0
+    truncated = False
+
+    try:
+        async for prefix, event, item in ijson.parse_async(_BoundedBody(response.aiter_bytes(), max_bytes)):
+            if prefix == "data.result.item" and event == "start_map":
+                if len(series) >= limit:
+                    truncated = True
+                    break
+                metric = {}
+                points = []
+            elif prefix == "data.result.item.metric" and event == "map_key":
+                metric_key = item
+            elif prefix.startswith("data.result.item.metric.") and event == "string":
+                metric[metric_key] = item
+            elif prefix == "data.result.item.values.item.item" and event == "number":
+                timestamp = float(item)
+            elif prefix == "data.result.item.values.item.item" and event == "string":
+                points.append((timestamp, float(item)))
+            elif prefix == "data.result.item" and event == "end_map":
+                series.append((metric, points))
+    except ResponseTooLargeError:
+        truncated = True
+    return series, truncated
@@ -0,0 +1,52 @@
+import asyncio
+import contextlib
+import signal
+
+import structlog
+from prometheus_client import start_http_server
+
+from src.analyzers.llm_client import LLMClient
+from src.config import settings
+from src.core.logging_config import configure_logging
+from src.services.leader import LeaderElector, get_lease_backend
+from src.services.runner import build_report_store, load_tokenizers, refresh_reports, run_monitors
+from src.services.scheduler import build_monitors
+
+logger = structlog.get_logger()
+
+
+async def run_worker() -> None:
+    configure_logging()
+    logger.info("worker_startup", app_name=settings.app_name)
+
+    if settings.metrics_enabled and settings.worker_metrics_port:
+        start_http_server(settings.worker_metrics_port, addr=settings.host)
+        logger.info("worker_metrics_started", port=settings.worker_metrics_port)
+
+    store = build_report_store()
+    if store is None:
+        logger.warning("report_store_disabled", detail="API processes will not see reports from this worker")
+
+    async with LLMClient() as llm_client:
+        monitors = build_monitors(llm_client, store)
+        await load_tokenizers(monitors)
+        await refresh_reports(monitors)
+        lease_backend = get_lease_backend()
+        elector = LeaderElector(lease_backend) if lease_backend is not None else None
+
+        task = asyncio.create_task(run_monitors(monitors, elector))
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, task.cancel)
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    logger.info("worker_shutdown", app_name=settings.app_name)
+
+
+def main() -> None:
+    asyncio.run(run_worker())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import numpy as np
+from src.analyzers.anomaly import series_stats
+
+
+def test_series_stats_flat_series():
+    ts = np.arange(60, dtype=np.float64) * 60
+    stats = series_stats(ts, np.full(60, 5.0))
+
+    assert stats is not None
+    assert stats.mean == 5.0
+    assert abs(stats.slope_per_hour) < 1e-9
+    assert stats.spikes == 0
+    assert stats.change_at is None
+    assert stats.is_anomalous is False
+
+
+def test_series_stats_detects_spike():
+    rng = np.random.default_rng(0)
+    values = 10 + rng.normal(0, 0.1, 60)
+    values[40] = 50.0
+    ts = np.arange(60, dtype=np.float64) * 60
+
+    stats = series_stats(ts, values)
+
+    assert stats is not None
+    assert stats.spikes == 1
+    assert stats.max_z_at == 40 * 60
+    assert stats.is_anomalous is True
+
+
+def test_series_stats_detects_level_shift_and_slope():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.normal(1.0, 0.05, 30), rng.normal(3.0, 0.05, 30)])
+    ts = np.arange(60, dtype=np.float64) * 60
+
+    stats = series_stats(ts, values)
+
+    assert stats is not None
+    assert stats.change_at == 30 * 60
+    assert stats.mean_before is not None and abs(stats.mean_before - 1.0) < 0.1
+    assert stats.mean_after is not None and abs(stats.mean_after - 3.0) < 0.1
+    assert stats.slope_per_hour > 0
+
+
+def test_series_stats_ignores_non_finite_values():
+    ts = np.arange(4, dtype=np.float64)
+    assert series_stats(ts, np.array([np.nan, np.inf, np.nan, np.nan])) is None
@@ -0,0 +1,34 @@
+import time
+
+from src.analyzers.cache import ReportCache, fingerprint, normalize
+
+
+def test_normalize_buckets_volatile_tokens():
+    a = "2026-01-05T10:00:01Z [3x, 10:00:01-10:05:00] request 5f1c2a9e-0b1d-4c7e-9a3e-1d2c3b4a5f6e took 103ms"
+    b = "2026-01-05T11:30:59Z [3x, 11:30:59-11:35:12] request 0a9b8c7d-6e5f-4a3b-2c1d-0e9f8a7b6c5d took 98ms"
+    assert normalize(a) == normalize(b)
+
+
+def test_normalize_keeps_meaningful_changes():
+    assert normalize("up: 1") != normalize("up: 0")
+    assert normalize("Errors: 3") != normalize("Errors: 300")
+    assert fingerprint("model-a", "data") != fingerprint("model-b", "data")
+
+
+def test_report_cache_lru_ttl_and_persistence(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.json")
+    cache = ReportCache(path, max_entries=2, ttl_seconds=60)
+    cache.put("a", "report a")
+    cache.put("b", "report b")
+    assert cache.get("a") == "report a"
+    cache.put("c", "report c")
+    assert cache.get("b") is None
+
+    reloaded = ReportCache(path, max_entries=2, ttl_seconds=60)
+    assert reloaded.get("a") == "report a"
+    assert reloaded.get("c") == "report c"
+
+    now = time.time()
+    monkeypatch.setattr("src.analyzers.cache.time.time", lambda: now + 120)
+    assert reloaded.get("a") is None
+    assert len(reloaded) == 1
@@ -0,0 +1,42 @@
+from src.analyzers.delta import Snapshot, compute_delta, render_delta
+
+
+def test_compute_delta_classifies_counts_and_gauges():
+    previous = Snapshot(
+        counts={"errors by job": {"api": 10, "worker": 4, "cron": 3, "db": 20}},
+        gauges={"P95 Latency": {"{job=api}": 0.2, "{job=db}": 0.5}},
+    )
+    current = Snapshot(
+        counts={"errors by job": {"api": 30, "worker": 5, "auth": 2, "db": 5}},
+        gauges={"P95 Latency": {"{job=api}": 0.9, "{job=db}": 0.52}},
+    )
+
+    delta = compute_delta(previous, current)
+
+    assert [c[1] for c in delta.new] == ["auth"]
+    assert [c[1] for c in delta.worsened] == ["api"]
+    assert [c[1] for c in delta.resolved] == ["cron"]
+    assert [c[1] for c in delta.improved] == ["db"]
+    assert [c[1] for c in delta.changed] == ["{job=api}"]
+    assert delta.unchanged == 2
+
+
+def test_compute_delta_skips_groups_missing_from_either_side():
+    previous = Snapshot(counts={"templates q1": {"boom <*>": 5}})
+    current = Snapshot(counts={"templates q2": {"other": 1}})
+
+    delta = compute_delta(previous, current)
+
+    assert delta.is_empty
+    assert delta.unchanged == 0
+
+
+def test_render_delta():
+    steady = Snapshot(counts={"errors by job": {"api": 3}})
+    assert render_delta(compute_delta(steady, steady)) == (
+        "No changes since the previous report; 1 tracked items steady."
+    )
+
+    worse = Snapshot(counts={"errors by job": {"api": 9}})
+    text = render_delta(compute_delta(steady, worse))
+    assert "Worsened (1):\n  [errors by job] api: 3 -> 9" in text
@@ -1,22 +1,9 @@
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock
 
-from src.analyzers.llm_analyzer import _build_fallback_report, _truncate_to_budget, analyze
+from src.analyzers.llm_analyzer import MAP_PROMPT, SYSTEM_PROMPT, _build_fallback_report, _report_cache, analyze
 from src.sources.base import SourceData
 
 
-def test_truncate_to_budget_fits():
-    data = [SourceData(source_name="test", summary="ok", raw_text="short log")]
-    result = _truncate_to_budget(data, max_tokens=1000)
-    assert "short log" in result
-    assert "truncated" not in result
-
-
-def test_truncate_to_budget_truncates():
-    data = [SourceData(source_name="test", summary="ok", raw_text="x" * 100000)]
-    result = _truncate_to_budget(data, max_tokens=100)
-    assert "truncated" in result
-
-
 def test_fallback_report():
     data = [
         SourceData(source_name="loki", summary="Errors: 5", raw_text="..."),
@@ -31,34 +18,26 @@ def test_fallback_report():
 async def test_analyze_with_llm(monkeypatch: object):
     monkeypatch.setattr("src.analyzers.llm_analyzer.settings.llm_api_key", "test-key")  # type: ignore[attr-defined]
 
-    mock_message = AsyncMock()
-    mock_message.content = "**Overall Status**: 🟢 Healthy"
-
-    mock_choice = AsyncMock()
-    mock_choice.message = mock_message
-
-    mock_response = AsyncMock()
-    mock_response.choices = [mock_choice]
-
     mock_client = AsyncMock()
-    mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+    mock_client.complete = AsyncMock(return_value="**Overall Status**: 🟢 Healthy")
 
-    with patch("src.analyzers.llm_analyzer._build_client", return_value=mock_client):
-        data = [SourceData(source_name="test", summary="ok", raw_text="all good")]
-        result = await analyze(data)
+    data = [SourceData(source_name="test", summary="ok", raw_text="all good")]
+    result = await analyze(data, mock_client)
 
     assert "Healthy" in result
+    messages = mock_client.complete.await_args.args[0]
+    assert messages[0]["role"] == "system"
+    assert "all good" in messages[1]["content"]
 
 
 async def test_analyze_falls_back_on_error(monkeypatch: object):
     monkeypatch.setattr("src.analyzers.llm_analyzer.settings.llm_api_key", "test-key")  # type: ignore[attr-defined]
 
     mock_client = AsyncMock()
-    mock_client.chat.completions.create = AsyncMock(side_effect=ConnectionError("down"))
+    mock_client.complete = AsyncMock(side_effect=ConnectionError("down"))
 
-    with patch("src.analyzers.llm_analyzer._build_client", return_value=mock_client):
-        data = [SourceData(source_name="test", summary="ok", raw_text="all good")]
-        result = await analyze(data)
+    data = [SourceData(source_name="test", summary="ok", raw_text="all good")]
+    result = await analyze(data, mock_client)
 
     assert "fallback" in result.lower()
 
@@ -69,3 +48,55 @@ async def test_analyze_without_api_key(monkeypatch: object):
     data = [SourceData(source_name="test", summary="ok", raw_text="all good")]
     result = await analyze(data)
     assert "fallback" in result.lower()
+
+
+async def test_analyze_reuses_cached_report(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.analyzers.llm_analyzer.settings.llm_api_key", "test-key")
+    monkeypatch.setattr("src.analyzers.llm_analyzer.settings.llm_cache_enabled", True)
+    monkeypatch.setattr("src.analyzers.llm_analyzer.settings.llm_cache_path", str(tmp_path / "cache.json"))
+    _report_cache.cache_clear()
+
+    mock_client = AsyncMock()
+    mock_client.complete = AsyncMock(return_value="Healthy")
+
+    try:
+        first = await analyze([SourceData(source_name="loki", summary="ok", raw_text="[12:00:01] warn x")], mock_client)
+        second = await analyze(
+            [SourceData(source_name="loki", summary="ok", raw_text="[12:05:09] warn x")], mock_client
+        )
+    finally:
+        _report_cache.cache_clear()
+
+    assert first == second == "Healthy"
+    assert mock_client.complete.await_count == 1
+
+
+async def test_analyze_map_reduce_for_large_input(monkeypatch):
+    monkeypatch.setattr("src.analyzers.llm_analyzer.settings.llm_api_key", "test-key")
+    monkeypatch.setattr("src.analyzers.llm_analyzer.settings.llm_map_reduce_enabled", True)
+    monkeypatch.setattr("src.analyzers.llm_analyzer.settings.llm_max_input_tokens", 500)
+    monkeypatch.setattr("src.analyzers.llm_analyzer.settings.llm_map_chunk_tokens", 300)
+
+    async def complete(messages, max_tokens=None, model=None):
+        if messages[0]["content"] == SYSTEM_PROMPT:
+            return "final report"
+        if "loki part 2/" in messages[1]["content"].lower():
+            raise ConnectionError("down")
+        return "notes"
+
+    mock_client = AsyncMock()
+    mock_client.complete = AsyncMock(side_effect=complete)
+    data = [
+        SourceData(source_name="loki", summary="Errors: 5", raw_text="\n".join(f"error {i}" * 10 for i in range(100))),
+        SourceData(source_name="prometheus", summary="All up", raw_text="up 1"),
+    ]
+
+    result = await analyze(data, mock_client)
+
+    assert result == "final report"
+    calls = mock_client.complete.await_args_list
+    map_calls = [c for c in calls if c.args[0][0]["content"] == MAP_PROMPT]
+    assert len(map_calls) == len(calls) - 1 > 3
+    reduce_input = calls[-1].args[0][1]["content"]
+    assert "=== PROMETHEUS ===" in reduce_input
+    assert "summary unavailable: down" in reduce_input
@@ -0,0 +1,139 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+import respx
+from src.analyzers.llm_client import LLMClient
+from src.analyzers.usage import LLMBudgetError, UsageTracker
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def _completion(content: str) -> dict[str, object]:
+    return {
+        "id": "c1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "m",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+    }
+
+
+@pytest.fixture
+def llm_settings(monkeypatch):
+    monkeypatch.setattr("src.analyzers.llm_client.settings.llm_api_key", "key")
+    monkeypatch.setattr("src.analyzers.llm_client.settings.llm_base_url", "https://llm.test/v1")
+    monkeypatch.setattr("src.analyzers.llm_client.settings.llm_retry_base_delay", 0.0)
+    monkeypatch.setattr("src.analyzers.llm_client.settings.llm_hedge_model", "")
+    monkeypatch.setattr("src.analyzers.llm_client.settings.llm_hedge_base_url", "")
+
+
+async def test_complete_retries_rate_limits_and_server_errors(llm_settings):
+    with respx.mock:
+        route = respx.post("https://llm.test/v1/chat/completions").mock(
+            side_effect=[
+                httpx.Response(429, json={"error": {"message": "slow down"}}),
+                httpx.Response(503, json={"error": {"message": "unavailable"}}),
+                httpx.Response(200, json=_completion("report")),
+            ]
+        )
+        async with LLMClient() as client:
+            assert await client.complete(MESSAGES) == "report"
+    assert route.call_count == 3
+
+
+async def test_complete_admits_every_retry(llm_settings, monkeypatch):
+    monkeypatch.setattr("src.analyzers.usage.settings.llm_max_requests_per_minute", 2)
+    with respx.mock:
+        route = respx.post("https://llm.test/v1/chat/completions").mock(
+            return_value=httpx.Response(503, json={"error": {"message": "unavailable"}})
+        )
+        async with LLMClient(UsageTracker()) as client:
+            with pytest.raises(LLMBudgetError, match="rate limit"):
+                await client.complete(MESSAGES)
+    assert route.call_count == 2
+
+
+async def test_complete_does_not_retry_client_errors(llm_settings):
+    with respx.mock:
+        route = respx.post("https://llm.test/v1/chat/completions").mock(
+            return_value=httpx.Response(400, json={"error": {"message": "bad request"}})
+        )
+        async with LLMClient() as client:
+            with pytest.raises(Exception, match="bad request"):
+                await client.complete(MESSAGES)
+    assert route.call_count == 1
+
+
+async def _slow(**kwargs: object) -> object:
+    await asyncio.sleep(10)
+    raise AssertionError("should have been cancelled")
+
+
+async def test_complete_hedges_slow_primary(llm_settings, monkeypatch):
+    monkeypatch.setattr("src.analyzers.llm_client.settings.llm_hedge_model", "cheap-model")
+    monkeypatch.setattr("src.analyzers.llm_client.settings.llm_hedge_min_delay", 0.05)
+
+    hedge_response = AsyncMock()
+    hedge_response.choices = [AsyncMock()]
+    hedge_response.choices[0].message.content = "hedged report"
+    hedge_response.usage = None
+
+    async with LLMClient(UsageTracker()) as client:
+        client._primary.chat.completions.create = AsyncMock(side_effect=_slow)  # type: ignore[method-assign]
+        assert client._hedge is not None
+        client._hedge.chat.completions.create = AsyncMock(return_value=hedge_response)  # type: ignore[method-assign]
+        assert await asyncio.wait_for(client.complete(MESSAGES), 2) == "hedged report"
+        assert client._hedge.chat.completions.create.await_args.kwargs["model"] == "cheap-model"
+        assert len(client._usage._requests) == 2
+
+
+async def test_complete_respects_total_timeout(llm_settings, monkeypatch):
+    monkeypatch.setattr("src.analyzers.llm_client.settings.llm_total_timeout", 0.05)
+
+    async with LLMClient() as client:
+        client._primary.chat.completions.create = AsyncMock(side_effect=_slow)  # type: ignore[method-assign]
+        with pytest.raises(TimeoutError):
+            await client.complete(MESSAGES)
+
+
+async def test_stream_yields_content_deltas(llm_settings):
+    def chunk(content: str) -> str:
+        payload = {
+            "id": "c1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "m",
+            "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    body = chunk("<b>Overall") + chunk(" Status</b>") + "data: [DONE]\n\n"
+    with respx.mock:
+        respx.post("https://llm.test/v1/chat/completions").mock(
+            return_value=httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+        )
+        async with LLMClient() as client:
+            tokens = [token async for token in client.stream(MESSAGES)]
+
+    assert tokens == ["<b>Overall", " Status</b>"]
+
+
+async def test_complete_records_usage_and_downgrades_over_budget(llm_settings, monkeypatch):
+    monkeypatch.setattr("src.analyzers.usage.settings.llm_hourly_token_budget", 140)
+    monkeypatch.setattr("src.analyzers.usage.settings.llm_budget_fallback_model", "cheap-model")
+    response = _completion("report") | {"usage": {"prompt_tokens": 90, "completion_tokens": 30, "total_tokens": 120}}
+    tracker = UsageTracker()
+
+    with respx.mock:
+        route = respx.post("https://llm.test/v1/chat/completions").mock(return_value=httpx.Response(200, json=response))
+        async with LLMClient(tracker) as client:
+            await client.complete(MESSAGES)
+            await client.complete(MESSAGES)
+
+    assert tracker.used(3600) == 240
+    models = [json.loads(call.request.content)["model"] for call in route.calls]
+    assert models[1] == "cheap-model"
+    assert models[0] != "cheap-model"
@@ -0,0 +1,36 @@
+from src.analyzers.log_templates import WILDCARD, TemplateMiner
+
+
+def test_miner_collapses_variable_tokens():
+    miner = TemplateMiner()
+    for i in range(50):
+        miner.add(f"Request {i} failed for user-{i} after 1{i}ms from 10.0.0.{i}", ts=1000 + i)
+
+    templates = miner.templates
+    assert len(templates) == 1
+    assert templates[0].count == 50
+    assert templates[0].first_ts == 1000
+    assert templates[0].last_ts == 1049
+    assert templates[0].sample == "Request 0 failed for user-0 after 10ms from 10.0.0.0"
+    assert WILDCARD in templates[0].template
+
+
+def test_miner_keeps_distinct_messages_apart():
+    miner = TemplateMiner()
+    miner.add("Connection refused to database", ts=1)
+    miner.add("Connection refused to database", ts=2)
+    miner.add("Disk quota exceeded on volume data", ts=3)
+
+    templates = miner.templates
+    assert [t.count for t in templates] == [2, 1]
+    assert templates[0].template == "Connection refused to database"
+
+
+def test_miner_merges_differing_tokens_into_wildcards():
+    miner = TemplateMiner()
+    miner.add("login failed for alice", ts=1)
+    miner.add("login failed for bob", ts=2)
+
+    templates = miner.templates
+    assert len(templates) == 1
+    assert templates[0].template == f"login failed for {WILDCARD}"
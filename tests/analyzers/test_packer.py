@@ -0,0 +1,118 @@
+import pytest
+import tiktoken
+from src.analyzers import packer
+from src.analyzers.packer import FALLBACK_ENCODING, count_tokens, pack_context, split_text
+from src.sources.base import SourceData
+
+
+@pytest.fixture(autouse=True)
+def _heuristic_tokenizer(monkeypatch):
+    monkeypatch.setattr(packer, "_encoding", lambda model: None)
+
+
+def test_pack_context_fits():
+    data = [SourceData(source_name="test", summary="ok", raw_text="short log")]
+    result = pack_context(data, max_tokens=1000, model="test-model")
+    assert result == "=== TEST ===\nSummary: ok\n\nshort log"
+
+
+def test_pack_context_truncates():
+    data = [SourceData(source_name="test", summary="ok", raw_text="x" * 100000)]
+    result = pack_context(data, max_tokens=100, model="test-model")
+    assert "truncated" in result
+    assert count_tokens(result, "test-model") <= 100
+
+
+def test_pack_context_keeps_every_section_and_uses_budget():
+    loki = "\n".join(f"log line {i} " + "x" * 60 for i in range(2000))
+    prom = "\n".join(f"metric {i}: {i}" for i in range(2000))
+    data = [
+        SourceData(source_name="loki", summary="Errors: 5", raw_text=loki, priority=1, min_share=0.3),
+        SourceData(source_name="prometheus", summary="All up", raw_text=prom, priority=2, min_share=0.3),
+    ]
+
+    result = pack_context(data, max_tokens=4000, model="test-model")
+
+    assert "=== LOKI ===" in result
+    assert "=== PROMETHEUS ===" in result
+    assert "metric 0: 0" in result
+    assert "log line 0 " in result
+    assert 3800 <= count_tokens(result, "test-model") <= 4000
+    loki_part, prom_part = result.split("=== PROMETHEUS ===")
+    assert len(prom_part) > len(loki_part) / 2
+
+
+def test_pack_context_priority_fills_leftover_budget():
+    small = SourceData(source_name="small", summary="s", raw_text="tiny", priority=0, min_share=0.1)
+    big_low = SourceData(source_name="low", summary="s", raw_text="a\n" * 5000, priority=0, min_share=0.1)
+    big_high = SourceData(source_name="high", summary="s", raw_text="b\n" * 5000, priority=5, min_share=0.1)
+
+    result = pack_context([small, big_low, big_high], max_tokens=1000, model="test-model")
+
+    low_part = result.split("=== LOW ===")[1].split("=== HIGH ===")[0]
+    high_part = result.split("=== HIGH ===")[1]
+    assert "tiny" in result
+    assert high_part.count("b") > 3 * low_part.count("a")
+
+
+def test_pack_context_cuts_at_line_boundary():
+    raw = "\n".join(f"line {i:04d}" for i in range(1000))
+    data = [SourceData(source_name="test", summary="ok", raw_text=raw)]
+
+    result = pack_context(data, max_tokens=200, model="test-model")
+
+    body = result.split("\n\n", 1)[1].removesuffix("\n... (truncated)")
+    assert all(line.startswith("line ") and len(line) == 9 for line in body.splitlines())
+
+
+def test_split_text_respects_chunk_size():
+    text = "\n".join(f"line {i:04d} " + "y" * 30 for i in range(200))
+
+    chunks = split_text(text, max_tokens=100, model="test-model")
+
+    assert len(chunks) > 1
+    assert "\n".join(chunks) == text
+    assert all(count_tokens(chunk, "test-model") <= 100 for chunk in chunks)
+
+
+def _byte_encoding() -> tiktoken.Encoding:
+    return tiktoken.Encoding(
+        name=FALLBACK_ENCODING,
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+
+
+async def test_load_encodings_retries_after_a_failure(monkeypatch):
+    monkeypatch.undo()
+    monkeypatch.setattr(packer, "_encodings", {})
+    calls: list[str] = []
+
+    def flaky_get_encoding(name: str) -> tiktoken.Encoding:
+        calls.append(name)
+        if len(calls) == 1:
+            raise OSError("network unreachable")
+        return _byte_encoding()
+
+    monkeypatch.setattr(packer.tiktoken, "get_encoding", flaky_get_encoding)
+
+    await packer.load_encodings(["google/gemini-2.0-flash"], timeout=1)
+    assert packer._encoding("google/gemini-2.0-flash") is None
+    assert count_tokens("abcdefgh", "google/gemini-2.0-flash") == 2
+
+    await packer.load_encodings(["google/gemini-2.0-flash", "other/model"], timeout=1)
+    await packer.load_encodings(["google/gemini-2.0-flash"], timeout=1)
+    assert calls == [FALLBACK_ENCODING, FALLBACK_ENCODING]
+    assert count_tokens("abcdefgh", "google/gemini-2.0-flash") == 8
+
+
+def test_pack_context_with_a_real_encoder(monkeypatch):
+    monkeypatch.undo()
+    monkeypatch.setattr(packer, "_encodings", {FALLBACK_ENCODING: _byte_encoding()})
+    data = [SourceData(source_name="test", summary="ok", raw_text="y" * 500)]
+
+    result = pack_context(data, max_tokens=100, model="any/model")
+
+    assert result.endswith("(truncated)")
+    assert len(result.encode()) <= 100
@@ -0,0 +1,69 @@
+from src.analyzers.delta import Snapshot
+from src.analyzers.rules import assess, render_healthy_report, report_status
+from src.sources.base import SourceData
+
+
+def _loki(errors: float = 0, warnings: float = 0) -> SourceData:
+    return SourceData(
+        source_name="loki",
+        summary=f"Errors: {errors:g}, Warnings: {warnings:g}",
+        raw_text="",
+        snapshot=Snapshot(counts={"errors by job": {"api": errors}, "warnings by job": {"api": warnings}}),
+    )
+
+
+def _prometheus(down: list[str] | None = None, latency: float = 0.1, error_rate: float = 0.0) -> SourceData:
+    return SourceData(
+        source_name="prometheus",
+        summary="All services up",
+        raw_text="",
+        snapshot=Snapshot(
+            counts={"down services": {s: 1.0 for s in down or []}},
+            gauges={"P95 Latency": {"{job=api}": latency}, "Error Rate 5xx (3600s)": {"{job=api}": error_rate}},
+        ),
+    )
+
+
+def test_assess_healthy():
+    assessment = assess([_loki(warnings=3), _prometheus()])
+    assert assessment.severity == "healthy"
+    assert assessment.findings == []
+
+
+def test_assess_flags_thresholds():
+    assert assess([_loki(errors=2), _prometheus()]).severity == "degraded"
+    assert assess([_loki(), _prometheus(latency=2.5)]).severity == "degraded"
+    assert assess([_loki(), _prometheus(error_rate=0.3)]).severity == "degraded"
+    critical = assess([_loki(errors=2), _prometheus(down=["db"])])
+    assert critical.severity == "critical"
+    assert len(critical.findings) == 2
+
+
+def test_assess_unknown_without_structured_data():
+    failed = SourceData(source_name="prometheus", summary="Error: connection refused", raw_text="")
+    assert assess([_loki(), failed]).severity == "unknown"
+    partial = _loki()
+    partial.partial = True
+    assert assess([partial, _prometheus()]).severity == "unknown"
+
+
+def test_assess_unknown_when_error_rate_or_latency_is_missing():
+    for group in ("P95 Latency", "Error Rate 5xx (3600s)"):
+        prometheus = _prometheus()
+        assert prometheus.snapshot is not None
+        del prometheus.snapshot.gauges[group]
+        assessment = assess([_loki(), prometheus])
+        assert assessment.severity == "unknown"
+        assert any("unavailable" in finding for finding in assessment.findings)
+
+
+def test_render_healthy_report():
+    report = render_healthy_report([_loki(), _prometheus()])
+    assert report.startswith("<b>Overall Status</b>: 🟢 Healthy")
+    assert "- prometheus: All services up" in report
+
+
+def test_report_status_reads_the_headline():
+    assert report_status("<b>Overall Status</b>: 🔴 Critical\n- db down") == "critical"
+    assert report_status("<b>Overall Status</b>: 🟢 Healthy") == "healthy"
+    assert report_status("<b>Overall Status</b>: ⚠️ LLM unavailable — fallback summary") == "unknown"
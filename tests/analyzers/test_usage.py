@@ -0,0 +1,54 @@
+import pytest
+from openai.types import CompletionUsage
+from prometheus_client import REGISTRY
+from src.analyzers.usage import LLMBudgetError, UsageTracker
+
+
+def _usage(total: int) -> CompletionUsage:
+    return CompletionUsage(prompt_tokens=total - 10, completion_tokens=10, total_tokens=total)
+
+
+def test_record_updates_counters():
+    before = REGISTRY.get_sample_value("llm_tokens_total", {"model": "usage-test", "kind": "prompt"}) or 0
+    tracker = UsageTracker()
+    tracker.record("usage-test", _usage(110))
+    tracker.record("usage-test", None)
+    assert REGISTRY.get_sample_value("llm_tokens_total", {"model": "usage-test", "kind": "prompt"}) == before + 100
+    assert tracker.used(3600) == 110
+
+
+def test_admit_downgrades_then_rejects_when_budget_spent(monkeypatch):
+    monkeypatch.setattr("src.analyzers.usage.settings.llm_hourly_token_budget", 1000)
+    monkeypatch.setattr("src.analyzers.usage.settings.llm_budget_fallback_model", "cheap")
+    tracker = UsageTracker()
+    assert tracker.admit("main") == "main"
+
+    tracker.record("main", _usage(850))
+    assert tracker.admit("main") == "cheap"
+
+    tracker.record("cheap", _usage(150))
+    with pytest.raises(LLMBudgetError, match="hourly token budget"):
+        tracker.admit("main")
+
+
+def test_budget_is_shared_across_models(monkeypatch):
+    monkeypatch.setattr("src.analyzers.usage.settings.llm_hourly_token_budget", 1000)
+    tracker = UsageTracker()
+    assert tracker.admit("payments-model") == "payments-model"
+    assert tracker.admit("search-model") == "search-model"
+
+    tracker.record("payments-model", _usage(600))
+    tracker.record("search-model", _usage(500))
+
+    for model in ("payments-model", "search-model"):
+        with pytest.raises(LLMBudgetError, match="hourly token budget"):
+            tracker.admit(model)
+
+
+def test_admit_rate_limits_requests(monkeypatch):
+    monkeypatch.setattr("src.analyzers.usage.settings.llm_max_requests_per_minute", 2)
+    tracker = UsageTracker()
+    tracker.admit("main")
+    tracker.admit("main")
+    with pytest.raises(LLMBudgetError, match="rate limit"):
+        tracker.admit("main")
@@ -0,0 +1,30 @@
+from httpx import ASGITransport, AsyncClient
+from src.main import app
+from src.services.alerts import AlertCoalescer
+from src.services.monitor import AgentMonitor
+
+
+async def test_alertmanager_webhook_schedules_targeted_tick():
+    monitor = AgentMonitor(sources=[], exporters=[])
+    coalescer = AlertCoalescer(monitor)
+    app.state.monitor = monitor
+    app.state.alert_coalescers = {"default": coalescer}
+    payload = {
+        "version": "4",
+        "status": "firing",
+        "receiver": "agent-monitoring",
+        "alerts": [
+            {"status": "firing", "labels": {"alertname": "HighErrorRate", "job": "api"}, "fingerprint": "a1"},
+            {"status": "firing", "labels": {"alertname": "HighErrorRate", "job": "api"}, "fingerprint": "a1"},
+            {"status": "resolved", "labels": {"alertname": "Down", "job": "db"}, "fingerprint": "b2"},
+        ],
+    }
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        resp = await client.post("/alerts/alertmanager", json=payload)
+        resolved = await client.post("/alerts/alertmanager", json={"status": "resolved", "alerts": []})
+
+    assert resp.status_code == 202
+    assert resp.json() == {"status": "scheduled", "pending": 1}
+    assert resolved.json() == {"status": "ignored", "pending": 1}
+    await coalescer.aclose()
@@ -1,6 +1,7 @@
 from datetime import UTC, datetime
 
 from httpx import ASGITransport, AsyncClient
+from src.core.report_store import ReportStore
 from src.main import app
 from src.services.monitor import AgentMonitor
 
@@ -31,3 +32,61 @@ async def test_report_endpoint_with_report():
     data = resp.json()
     assert data["report"] == "Test report"
     assert data["generated_at"] is not None
+
+
+async def test_report_stream_without_run_sends_last_report():
+    monitor = AgentMonitor(sources=[], exporters=[])
+    monitor._last_report = "Done report"
+    app.state.monitor = monitor
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        resp = await client.get("/report/stream")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    assert resp.text == 'event: report\ndata: "Done report"\n\n'
+
+
+async def test_report_endpoint_selects_profile():
+    default = AgentMonitor(sources=[], exporters=[])
+    payments = AgentMonitor(sources=[], exporters=[])
+    payments._last_report = "Payments report"
+    app.state.monitor = default
+    app.state.monitors = {"default": default, "payments": payments}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        resp = await client.get("/report", params={"profile": "payments"})
+        missing = await client.get("/report", params={"profile": "nope"})
+
+    assert resp.json()["report"] == "Payments report"
+    assert missing.status_code == 404
+
+
+async def test_reports_history_paginates(tmp_path):
+    store = ReportStore(str(tmp_path / "reports.db"))
+    for i in range(3):
+        store.append("default", "degraded" if i % 2 else "healthy", f"report {i}", created_at=1_700_000_000.0 + i)
+    app.state.monitor = AgentMonitor(sources=[], exporters=[])
+    app.state.report_store = store
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        first = await client.get("/reports", params={"limit": 2})
+        second = await client.get("/reports", params={"limit": 2, "cursor": first.json()["next_cursor"]})
+        degraded = await client.get("/reports", params={"status": "degraded"})
+        bad_cursor = await client.get("/reports", params={"cursor": "nope"})
+
+    assert [r["report"] for r in first.json()["reports"]] == ["report 2", "report 1"]
+    assert [r["report"] for r in second.json()["reports"]] == ["report 0"]
+    assert second.json()["next_cursor"] is None
+    assert [r["report"] for r in degraded.json()["reports"]] == ["report 1"]
+    assert bad_cursor.status_code == 400
+
+
+async def test_reports_history_disabled():
+    app.state.monitor = AgentMonitor(sources=[], exporters=[])
+    app.state.report_store = None
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        resp = await client.get("/reports")
+
+    assert resp.status_code == 404
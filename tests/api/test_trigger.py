@@ -1,27 +1,31 @@
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 from httpx import ASGITransport, AsyncClient
 from src.main import app
+from src.services.leader import LeaderElector, SQLiteLeaseBackend
 from src.services.monitor import AgentMonitor
+from src.sources.base import SourceData
 
 
 async def test_trigger_starts_tick():
     monitor = AgentMonitor(sources=[], exporters=[])
     app.state.monitor = monitor
 
-    with patch.object(monitor, "tick", new_callable=AsyncMock) as mock_tick:
+    with patch.object(monitor, "_run", new_callable=AsyncMock) as mock_run:
         async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
             resp = await client.post("/trigger")
+        await asyncio.sleep(0)
 
     assert resp.status_code == 202
     data = resp.json()
     assert data["status"] == "started"
-    mock_tick.assert_called_once()
+    mock_run.assert_called_once()
 
 
 async def test_trigger_already_running():
     monitor = AgentMonitor(sources=[], exporters=[])
-    monitor._running = True
+    monitor.begin()
     app.state.monitor = monitor
 
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
@@ -30,3 +34,55 @@ async def test_trigger_already_running():
     assert resp.status_code == 202
     data = resp.json()
     assert data["status"] == "already_running"
+
+
+async def test_trigger_wait_joins_the_in_flight_tick():
+    source = AsyncMock()
+    source.name = "test_source"
+    source.fetch.return_value = SourceData(source_name="test_source", summary="ok", raw_text="all good")
+    monitor = AgentMonitor(sources=[source], exporters=[])
+    app.state.monitor = monitor
+    release = asyncio.Event()
+
+    async def fake_analyze(source_data, client=None, on_token=None, model=None):
+        await release.wait()
+        return "Fresh report"
+
+    with patch("src.services.monitor.llm_analyzer.analyze", side_effect=fake_analyze) as mock_analyze:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/trigger", params={"wait": "true"}))
+            second = asyncio.create_task(client.post("/trigger", params={"wait": "true"}))
+            scheduled = asyncio.create_task(monitor.tick())
+            await asyncio.sleep(0.05)
+            release.set()
+            responses = await asyncio.gather(first, second)
+            assert await scheduled == "Fresh report"
+
+    assert [r.status_code for r in responses] == [200, 200]
+    assert all(r.json()["status"] == "completed" for r in responses)
+    assert all(r.json()["report"] == "Fresh report" for r in responses)
+    assert mock_analyze.call_count == 1
+    source.fetch.assert_awaited_once()
+
+
+async def test_trigger_is_rejected_on_a_follower_replica(tmp_path):
+    app.state.monitor = AgentMonitor(sources=[], exporters=[])
+    app.state.elector = LeaderElector(SQLiteLeaseBackend(str(tmp_path / "leader.db")))
+
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            resp = await client.post("/trigger")
+    finally:
+        app.state.elector = None
+
+    assert resp.status_code == 503
+
+
+async def test_trigger_is_rejected_in_api_mode(monkeypatch):
+    monkeypatch.setattr("src.dependencies.settings.monitor_mode", "api")
+    app.state.monitor = AgentMonitor(sources=[], exporters=[])
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        resp = await client.post("/trigger")
+
+    assert resp.status_code == 503
@@ -0,0 +1,55 @@
+from src.core.report_store import ReportStore
+
+
+def _store(tmp_path, **kwargs) -> ReportStore:
+    return ReportStore(str(tmp_path / "nested" / "reports.db"), **kwargs)
+
+
+def test_report_store_pages_newest_first(tmp_path):
+    store = _store(tmp_path)
+    for i in range(5):
+        store.append("default", "healthy", f"report {i}", created_at=1000.0 + i)
+    store.append("payments", "healthy", "other profile", created_at=2000.0)
+
+    first, cursor = store.query("default", limit=2)
+    second, cursor2 = store.query("default", limit=2, cursor=cursor)
+    third, cursor3 = store.query("default", limit=2, cursor=cursor2)
+
+    assert [r.report for r in first + second + third] == [f"report {i}" for i in range(4, -1, -1)]
+    assert cursor3 is None
+    assert store.latest("payments") is not None
+
+
+def test_report_store_filters_by_time_and_status(tmp_path):
+    store = _store(tmp_path)
+    for i, status in enumerate(["healthy", "degraded", "critical", "degraded"]):
+        store.append("default", status, f"report {i}", created_at=1000.0 + i)
+
+    degraded, _ = store.query("default", status="degraded")
+    window, _ = store.query("default", since=1001.0, until=1003.0)
+
+    assert [r.report for r in degraded] == ["report 3", "report 1"]
+    assert [r.report for r in window] == ["report 2", "report 1"]
+
+
+def test_report_store_retention(tmp_path):
+    store = _store(tmp_path, max_age=100, max_reports=3)
+    store.append("default", "healthy", "too old", created_at=1000.0)
+    for i in range(4):
+        store.append("default", "healthy", f"report {i}", created_at=1200.0 + i)
+
+    reports, _ = store.query("default")
+
+    assert [r.report for r in reports] == ["report 3", "report 2", "report 1"]
+
+
+def test_report_store_caps_each_profile_and_kind_separately(tmp_path):
+    store = _store(tmp_path, max_reports=2)
+    store.append("quiet", "healthy", "quiet report", created_at=1000.0)
+    for i in range(5):
+        store.append("busy", "critical", f"alert {i}", created_at=1100.0 + i, kind="alert")
+    store.append("busy", "healthy", "busy report", created_at=1200.0)
+
+    assert [r.report for r in store.query("quiet")[0]] == ["quiet report"]
+    assert [r.report for r in store.query("busy", kind="alert")[0]] == ["alert 4", "alert 3"]
+    assert [r.report for r in store.query("busy", kind="full")[0]] == ["busy report"]
@@ -0,0 +1,14 @@
+from src.core.state import load_json_state, save_json_state
+
+
+def test_state_roundtrip(tmp_path):
+    path = str(tmp_path / "nested" / "state.json")
+    save_json_state(path, {"a": 1})
+    assert load_json_state(path) == {"a": 1}
+
+
+def test_state_missing_or_corrupt(tmp_path):
+    assert load_json_state(str(tmp_path / "missing.json")) == {}
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{not json")
+    assert load_json_state(str(corrupt)) == {}
@@ -0,0 +1,74 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+from src.schemas.alerts import Alert
+from src.services.alerts import AlertCoalescer, alert_jobs, render_alerts
+from src.services.monitor import AgentMonitor
+
+
+def _alert(job: str | None, name: str = "HighErrorRate") -> Alert:
+    labels = {"alertname": name}
+    if job is not None:
+        labels["job"] = job
+    return Alert(labels=labels, annotations={"summary": f"{name} on {job}"})
+
+
+def test_alert_jobs_narrows_to_labelled_jobs():
+    assert alert_jobs([_alert("web"), _alert("api"), _alert("web")]) == ["api", "web"]
+    assert alert_jobs([_alert("web"), _alert(None)]) is None
+
+
+def test_render_alerts_lists_firing_alerts():
+    data = render_alerts([_alert("web", "HighLatency")])
+
+    assert data.source_name == "alertmanager"
+    assert "HighLatency [job=web] HighLatency on web" in data.raw_text
+
+
+async def test_coalescer_runs_one_tick_for_a_burst(monkeypatch):
+    monkeypatch.setattr("src.services.alerts.settings.alerts_debounce_seconds", 0.05)
+    monitor = AgentMonitor(sources=[], exporters=[])
+    monitor.targeted_tick = AsyncMock(return_value=True)  # type: ignore[method-assign]
+    coalescer = AlertCoalescer(monitor)
+
+    for i in range(100):
+        coalescer.submit([_alert("web" if i % 2 else "api", f"Alert{i}")])
+    assert coalescer.pending == 100
+    assert not coalescer.submit([Alert(status="resolved", labels={"job": "db"})])
+
+    await asyncio.sleep(0.2)
+
+    monitor.targeted_tick.assert_awaited_once()
+    jobs, context = monitor.targeted_tick.await_args.args
+    assert jobs == ["api", "web"]
+    assert context[0].summary == "100 firing alerts"
+    assert coalescer.pending == 0
+    await coalescer.aclose()
+
+
+async def test_coalescer_queues_alerts_that_arrive_during_a_tick(monkeypatch):
+    monkeypatch.setattr("src.services.alerts.settings.alerts_debounce_seconds", 0.02)
+    monitor = AgentMonitor(sources=[], exporters=[])
+    release = asyncio.Event()
+    calls: list[list[str] | None] = []
+
+    async def slow_tick(jobs, context):
+        calls.append(jobs)
+        await release.wait()
+        return "alert report"
+
+    monitor.targeted_tick = slow_tick  # type: ignore[method-assign]
+    coalescer = AlertCoalescer(monitor)
+
+    coalescer.submit([_alert("web")])
+    await asyncio.sleep(0.05)
+    coalescer.submit([_alert("api")])
+    await asyncio.sleep(0.05)
+    assert calls == [["web"]]
+
+    release.set()
+    await asyncio.sleep(0.05)
+
+    assert calls == [["web"], ["api"]]
+    assert coalescer.pending == 0
+    await coalescer.aclose()
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from pydantic import ValidationError
+from src.config import Settings
+from src.services.leader import LEASE_NAME, LeaderElector, SQLiteLeaseBackend
+
+
+def test_sqlite_lease_is_exclusive_until_it_expires(tmp_path):
+    backend = SQLiteLeaseBackend(str(tmp_path / "nested" / "leader.db"))
+
+    assert backend.acquire(LEASE_NAME, "a", ttl=30)
+    assert not backend.acquire(LEASE_NAME, "b", ttl=30)
+    assert backend.acquire(LEASE_NAME, "a", ttl=30)
+
+    assert backend.acquire(LEASE_NAME, "a", ttl=-1)
+    assert backend.acquire(LEASE_NAME, "b", ttl=30)
+
+    backend.release(LEASE_NAME, "a")
+    assert not backend.acquire(LEASE_NAME, "a", ttl=30)
+    backend.release(LEASE_NAME, "b")
+    assert backend.acquire(LEASE_NAME, "a", ttl=30)
+
+
+async def test_only_one_elector_leads_and_the_other_takes_over(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.services.leader.settings.leader_lease_ttl", 0.2)
+    monkeypatch.setattr("src.services.leader.settings.leader_renew_interval", 0.02)
+    path = str(tmp_path / "leader.db")
+    leading: list[str] = []
+    follows: dict[str, int] = {"a": 0, "b": 0}
+
+    def elect(holder: str) -> tuple[LeaderElector, asyncio.Task[None]]:
+        elector = LeaderElector(SQLiteLeaseBackend(path), holder=holder)
+
+        async def lead() -> None:
+            leading.append(holder)
+            await asyncio.Event().wait()
+
+        async def follow() -> None:
+            follows[holder] += 1
+
+        return elector, asyncio.create_task(elector.run(lead, follow))
+
+    first, first_task = elect("a")
+    await asyncio.sleep(0.05)
+    second, second_task = elect("b")
+    await asyncio.sleep(0.1)
+
+    assert leading == ["a"]
+    assert first.is_leader and not second.is_leader
+    assert follows["b"] > 0
+
+    first_task.cancel()
+    await asyncio.gather(first_task, return_exceptions=True)
+    await asyncio.sleep(0.1)
+
+    assert leading == ["a", "b"]
+    assert second.is_leader
+
+    second_task.cancel()
+    await asyncio.gather(second_task, return_exceptions=True)
+
+
+async def test_leader_steps_down_when_renewal_hangs_past_the_ttl(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.services.leader.settings.leader_lease_ttl", 0.2)
+    monkeypatch.setattr("src.services.leader.settings.leader_renew_interval", 0.05)
+    backend = SQLiteLeaseBackend(str(tmp_path / "leader.db"))
+    acquire = backend.acquire
+    hang = threading.Event()
+
+    def slow_acquire(lease: str, holder: str, ttl: float) -> bool:
+        if hang.is_set():
+            time.sleep(0.5)
+        return acquire(lease, holder, ttl)
+
+    backend.acquire = slow_acquire  # type: ignore[method-assign]
+    elector = LeaderElector(backend, holder="a")
+    cancelled = asyncio.Event()
+
+    async def lead() -> None:
+        try:
+            await asyncio.Event().wait()
+        finally:
+            cancelled.set()
+
+    async def follow() -> None:
+        pass
+
+    task = asyncio.create_task(elector.run(lead, follow))
+    await asyncio.sleep(0.1)
+    assert elector.is_leader
+
+    hang.set()
+    started = asyncio.get_running_loop().time()
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    assert asyncio.get_running_loop().time() - started <= 0.2
+    assert not elector.is_leader
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def test_renew_interval_must_be_shorter_than_ttl():
+    with pytest.raises(ValidationError):
+        Settings(leader_lease_ttl=10, leader_renew_interval=10)
@@ -1,5 +1,8 @@
+import asyncio
 from unittest.mock import AsyncMock, patch
 
+from src.analyzers.delta import Snapshot
+from src.core.report_store import ReportStore
 from src.services.monitor import AgentMonitor
 from src.sources.base import SourceData
 
@@ -58,3 +61,173 @@ async def test_monitor_tick_handles_exporter_error():
         await monitor.tick()
 
     assert monitor.last_report == "Test report"
+
+
+async def test_monitor_fetch_keeps_partial_results_at_deadline(monkeypatch):
+    monkeypatch.setattr("src.services.monitor.settings.monitor_fetch_timeout", 0.05)
+    monkeypatch.setattr("src.services.monitor.FETCH_GRACE_SECONDS", 0.05)
+
+    partial_source = AsyncMock()
+    partial_source.name = "partial_source"
+    partial_source.fetch.return_value = SourceData(
+        source_name="partial_source", summary="some", raw_text="half", partial=True
+    )
+
+    async def _hang(lookback_seconds: int, deadline: float | None = None, jobs: list[str] | None = None) -> SourceData:
+        await asyncio.sleep(10)
+        raise AssertionError("unreachable")
+
+    stuck_source = AsyncMock()
+    stuck_source.name = "stuck_source"
+    stuck_source.fetch.side_effect = _hang
+
+    monitor = AgentMonitor(sources=[partial_source, stuck_source], exporters=[])
+    results = await asyncio.wait_for(monitor._fetch_all(), timeout=1)
+
+    assert results[0].partial is True
+    assert results[0].raw_text == "half"
+    assert results[1].partial is True
+    assert "Timed out" in results[1].summary
+    deadline = partial_source.fetch.call_args.args[1]
+    assert deadline is not None
+
+
+async def test_monitor_streams_tokens_to_listeners():
+    monitor = AgentMonitor(sources=[], exporters=[])
+    release = asyncio.Event()
+
+    async def fake_analyze(source_data, client=None, on_token=None, model=None):
+        on_token("<b>Overall")
+        await release.wait()
+        on_token(" Status</b>")
+        return "<b>Overall Status</b>"
+
+    with patch("src.services.monitor.llm_analyzer.analyze", side_effect=fake_analyze):
+        tick = asyncio.create_task(monitor.tick(stream=True))
+        await asyncio.sleep(0)
+        assert monitor.partial_report == "<b>Overall"
+
+        events = monitor.events()
+        assert await anext(events) == ("partial", "<b>Overall")
+        release.set()
+        rest = [event async for event in events]
+        await tick
+
+    assert rest == [("token", " Status</b>"), ("report", "<b>Overall Status</b>")]
+    assert monitor.partial_report is None
+    assert monitor.last_report == "<b>Overall Status</b>"
+
+
+async def test_monitor_sends_delta_after_first_tick(monkeypatch):
+    monkeypatch.setattr("src.services.monitor.settings.monitor_delta_enabled", True)
+
+    def data(count: float) -> SourceData:
+        return SourceData(
+            source_name="loki",
+            summary="Errors: 1",
+            raw_text="full raw text",
+            snapshot=Snapshot(counts={"errors by job": {"api": count}}),
+        )
+
+    mock_source = AsyncMock()
+    mock_source.name = "loki"
+    mock_source.fetch.side_effect = [data(3), data(12)]
+    monitor = AgentMonitor(sources=[mock_source], exporters=[])
+
+    with patch("src.services.monitor.llm_analyzer") as mock_analyzer:
+        mock_analyzer.analyze = AsyncMock(return_value="report")
+        await monitor.tick()
+        await monitor.tick()
+
+    first, second = (call.args[0][0].raw_text for call in mock_analyzer.analyze.await_args_list)
+    assert first == "full raw text"
+    assert "Worsened (1)" in second
+    assert "api: 3 -> 12" in second
+
+
+async def test_monitor_fast_path_skips_llm_when_healthy(monkeypatch):
+    monkeypatch.setattr("src.services.monitor.settings.rules_fast_path_enabled", True)
+    mock_source = AsyncMock()
+    mock_source.name = "prometheus"
+    mock_source.fetch.return_value = SourceData(
+        source_name="prometheus",
+        summary="All services up",
+        raw_text="up: 1",
+        snapshot=Snapshot(
+            counts={"down services": {}},
+            gauges={"Error Rate 5xx (5m)": {}, "P95 Latency": {"job=api": 0.2}},
+        ),
+    )
+    monitor = AgentMonitor(sources=[mock_source], exporters=[])
+
+    with patch("src.services.monitor.llm_analyzer") as mock_analyzer:
+        mock_analyzer.analyze = AsyncMock(return_value="llm report")
+        await monitor.tick()
+        assert "Healthy" in (monitor.last_report or "")
+        mock_analyzer.analyze.assert_not_awaited()
+
+        mock_source.fetch.return_value = SourceData(
+            source_name="prometheus",
+            summary="Down services: ['db']",
+            raw_text="up: 0",
+            snapshot=Snapshot(counts={"down services": {"db": 1.0}}),
+        )
+        await monitor.tick()
+        assert monitor.last_report == "llm report"
+
+
+async def test_monitor_joined_tick_gets_none_when_the_run_fails():
+    monitor = AgentMonitor(sources=[], exporters=[])
+    release = asyncio.Event()
+
+    async def failing_analyze(source_data, client=None, on_token=None, model=None):
+        await release.wait()
+        raise RuntimeError("llm down")
+
+    with patch("src.services.monitor.llm_analyzer.analyze", side_effect=failing_analyze):
+        assert monitor.trigger() is True
+        assert monitor.trigger() is False
+        joined = asyncio.create_task(monitor.tick())
+        await asyncio.sleep(0)
+        release.set()
+        assert await joined is None
+
+    assert monitor.running is False
+    assert monitor.last_report is None
+
+
+async def test_monitor_records_reports_and_restores_the_latest(tmp_path):
+    store = ReportStore(str(tmp_path / "reports.db"))
+    monitor = AgentMonitor(sources=[], exporters=[], store=store)
+
+    with patch("src.services.monitor.llm_analyzer") as mock_analyzer:
+        mock_analyzer.analyze = AsyncMock(return_value="<b>Overall Status</b>: 🟡 Degraded\nbody")
+        await monitor.tick()
+
+    [stored], _ = store.query("default")
+    assert stored.status == "degraded"
+
+    restarted = AgentMonitor(sources=[], exporters=[], store=store)
+    await restarted.refresh()
+    assert restarted.last_report == stored.report
+    assert restarted.last_report_at == monitor.last_report_at
+
+
+async def test_targeted_tick_keeps_alert_reports_apart(tmp_path):
+    store = ReportStore(str(tmp_path / "reports.db"))
+    monitor = AgentMonitor(sources=[], exporters=[], store=store)
+    monitor._last_report = "hourly report"
+    monitor.begin()
+    inflight = monitor._inflight
+
+    with patch("src.services.monitor.llm_analyzer") as mock_analyzer:
+        mock_analyzer.analyze = AsyncMock(return_value="<b>Overall Status</b>: 🔴 Critical\nalert body")
+        await monitor.targeted_tick(["api"], [])
+
+    assert monitor.last_report == "hourly report"
+    assert monitor.last_alert_report is not None
+    assert inflight is not None and not inflight.done()
+    [stored], _ = store.query("default")
+    assert stored.kind == "alert"
+    assert store.latest("default") is None
+    monitor.end()
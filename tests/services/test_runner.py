@@ -0,0 +1,29 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from src.core.report_store import ReportStore
+from src.services.monitor import AgentMonitor
+from src.services.runner import poll_reports
+
+
+async def test_api_process_picks_up_reports_published_by_the_worker(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.services.runner.settings.monitor_poll_interval", 0.02)
+    path = str(tmp_path / "reports.db")
+    worker = AgentMonitor(sources=[], exporters=[], store=ReportStore(path))
+    api = AgentMonitor(sources=[], exporters=[], store=ReportStore(path))
+
+    polling = asyncio.create_task(poll_reports([api]))
+    try:
+        await asyncio.sleep(0.05)
+        assert api.last_report is None
+
+        with patch("src.services.monitor.llm_analyzer") as mock_analyzer:
+            mock_analyzer.analyze = AsyncMock(return_value="Worker report")
+            await worker.tick()
+        await asyncio.sleep(0.1)
+    finally:
+        polling.cancel()
+        await asyncio.gather(polling, return_exceptions=True)
+
+    assert api.last_report == "Worker report"
+    assert api.last_report_at == worker.last_report_at
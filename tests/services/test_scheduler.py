@@ -0,0 +1,202 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+from src.config import MonitorProfile, Settings
+from src.services.scheduler import MonitorScheduler, build_monitors, next_aligned, slot_offset
+
+
+def test_build_monitors_applies_profile_overrides(monkeypatch):
+    monkeypatch.setattr("src.services.scheduler.settings.monitor_interval", 3600)
+    monkeypatch.setattr("src.services.scheduler.settings.telegram_bot_token", "token")
+    monkeypatch.setattr("src.services.scheduler.settings.telegram_chat_ids", ["global"])
+    monkeypatch.setattr(
+        "src.services.scheduler.settings.monitor_profiles",
+        [
+            MonitorProfile(name="payments", monitor_interval=600, lookback_period=900, telegram_chat_ids=["-1"]),
+            MonitorProfile(name="search"),
+        ],
+    )
+
+    payments, search = build_monitors()
+
+    assert (payments.name, payments.interval, payments.lookback) == ("payments", 600, 900)
+    assert (search.name, search.interval) == ("search", 3600)
+    assert [e.chat_ids for e in payments._exporters] == [["-1"]]  # type: ignore[attr-defined]
+    assert [e.chat_ids for e in search._exporters] == [["global"]]  # type: ignore[attr-defined]
+    assert payments._fetch_limit is search._fetch_limit
+
+
+def test_build_readonly_monitors_skips_sources_and_exporters(monkeypatch):
+    monkeypatch.setattr("src.services.scheduler.settings.monitor_profiles", [MonitorProfile(name="payments")])
+
+    with patch("src.services.scheduler.get_configured_sources") as sources:
+        (monitor,) = build_monitors(readonly=True)
+
+    sources.assert_not_called()
+    assert (monitor.name, monitor._sources, monitor._exporters) == ("payments", [], [])
+
+
+def test_api_mode_requires_the_report_store():
+    with pytest.raises(ValidationError, match="report store"):
+        Settings(monitor_mode="api", report_store_enabled=False)
+
+
+class _FakeMonitor:
+    def __init__(self, name: str, interval: float) -> None:
+        self.name = name
+        self.interval = interval
+        self.running = False
+        self.running_since: float | None = None
+        self.fetches = 0
+        self.exported: list[str] = []
+
+    def begin(self) -> bool:
+        if self.running:
+            return False
+        self.running = True
+        return True
+
+    def end(self) -> None:
+        self.running = False
+
+    async def fetch(self) -> list[str]:
+        self.fetches += 1
+        return [f"data {self.fetches}"]
+
+    async def analyze(self, source_data: list[str]) -> str:
+        return f"report for {source_data[0]}"
+
+    async def export(self, report: str) -> None:
+        self.exported.append(report)
+
+
+async def _run_for(scheduler: MonitorScheduler, seconds: float) -> None:
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(seconds)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def test_next_aligned():
+    assert next_aligned(3600, 7200) == 10800
+    assert next_aligned(3600, 7201.5) == 10800
+    assert next_aligned(0.5, 10.2) == 10.5
+    assert next_aligned(3600, 7201.5, offset=90) == 7290
+    assert next_aligned(3600, 7300, offset=90) == 10890
+
+
+def test_slot_offsets_spread_profiles(monkeypatch):
+    monkeypatch.setattr("src.services.scheduler.settings.scheduler_slot_spread_seconds", 300)
+    offsets = {slot_offset(f"team-{i}", 3600) for i in range(20)}
+    assert len(offsets) > 10
+    assert all(0 <= offset < 300 for offset in offsets)
+    assert slot_offset("team-1", 60) < 60
+
+
+async def test_scheduler_runs_profiles_through_the_pipeline():
+    fast = _FakeMonitor("fast", 0.05)
+    slow = _FakeMonitor("slow", 10)
+
+    await _run_for(MonitorScheduler([fast, slow]), 0.18)  # type: ignore[list-item]
+
+    assert 3 <= fast.fetches <= 5
+    assert fast.exported[:2] == ["report for data 1", "report for data 2"]
+    assert slow.exported == ["report for data 1"]
+    assert not fast.running
+
+
+async def test_scheduler_skips_profile_still_running():
+    busy = _FakeMonitor("busy", 0.01)
+    busy.running = True
+
+    await _run_for(MonitorScheduler([busy]), 0.05)  # type: ignore[list-item]
+
+    assert busy.fetches == 0
+
+
+async def test_slow_export_does_not_delay_next_fetch():
+    monitor = _FakeMonitor("team", 0.05)
+    release = asyncio.Event()
+
+    async def slow_export(report: str) -> None:
+        await release.wait()
+        monitor.exported.append(report)
+
+    monitor.export = slow_export  # type: ignore[method-assign]
+
+    await _run_for(MonitorScheduler([monitor]), 0.18)  # type: ignore[list-item]
+
+    assert monitor.fetches >= 3
+    assert monitor.exported == []
+
+
+async def test_cancelled_scheduler_ends_runs_it_began():
+    monitor = _FakeMonitor("stuck", 10)
+    release = asyncio.Event()
+
+    async def hanging_fetch() -> list[str]:
+        await release.wait()
+        return []
+
+    monitor.fetch = hanging_fetch  # type: ignore[method-assign]
+
+    await _run_for(MonitorScheduler([monitor]), 0.05)  # type: ignore[list-item]
+
+    assert not monitor.running
+
+
+async def test_scheduler_retries_a_slot_after_an_overrun(monkeypatch):
+    monkeypatch.setattr("src.services.scheduler.SLOT_RETRY_SECONDS", 0.02)
+    monitor = _FakeMonitor("hourly", 3600)
+    monitor.running = True
+    monitor.running_since = asyncio.get_running_loop().time() - 3 * 3600
+
+    async def release() -> None:
+        await asyncio.sleep(0.05)
+        monitor.running = False
+
+    releasing = asyncio.create_task(release())
+    await _run_for(MonitorScheduler([monitor]), 0.15)  # type: ignore[list-item]
+    await releasing
+
+    assert monitor.fetches == 1
+
+
+async def test_scheduler_treats_a_running_tick_as_covering_the_slot(monkeypatch):
+    monkeypatch.setattr("src.services.scheduler.SLOT_RETRY_SECONDS", 0.02)
+    monitor = _FakeMonitor("hourly", 3600)
+    monitor.running = True
+    monitor.running_since = asyncio.get_running_loop().time() - 5
+
+    async def release() -> None:
+        await asyncio.sleep(0.05)
+        monitor.running = False
+
+    releasing = asyncio.create_task(release())
+    await _run_for(MonitorScheduler([monitor]), 0.15)  # type: ignore[list-item]
+    await releasing
+
+    assert monitor.fetches == 0
+
+
+def test_profile_names_are_restricted():
+    with pytest.raises(ValidationError):
+        Settings(monitor_profiles=[MonitorProfile(name="../etc")])
+
+
+async def test_slow_export_of_one_profile_does_not_stall_others():
+    stuck = _FakeMonitor("stuck", 0.03)
+    healthy = _FakeMonitor("healthy", 0.03)
+    release = asyncio.Event()
+
+    async def stuck_export(report: str) -> None:
+        await release.wait()
+
+    stuck.export = stuck_export  # type: ignore[method-assign]
+
+    await _run_for(MonitorScheduler([stuck, healthy]), 0.2)  # type: ignore[list-item]
+
+    assert stuck.fetches >= 3
+    assert len(healthy.exported) >= 3
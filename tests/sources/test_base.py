@@ -0,0 +1,34 @@
+import asyncio
+
+from src.sources.base import gather_until
+
+
+async def test_gather_until_returns_finished_results_at_deadline():
+    async def fast() -> str:
+        return "fast"
+
+    async def slow() -> str:
+        await asyncio.sleep(10)
+        return "slow"
+
+    async def broken() -> str:
+        raise ValueError("boom")
+
+    deadline = asyncio.get_running_loop().time() + 0.05
+    results, partial = await gather_until([fast(), slow(), broken()], deadline)
+
+    assert partial is True
+    assert results[0] == "fast"
+    assert isinstance(results[1], TimeoutError)
+    assert isinstance(results[2], ValueError)
+
+
+async def test_gather_until_without_deadline_waits_for_all():
+    async def value(v: int) -> int:
+        await asyncio.sleep(0)
+        return v
+
+    results, partial = await gather_until([value(1), value(2)], None)
+
+    assert results == [1, 2]
+    assert partial is False
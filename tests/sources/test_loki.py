@@ -1,3 +1,7 @@
+import asyncio
+import time
+
+import httpx
 import respx
 from httpx import Response
 from src.sources.loki import LokiSource
@@ -79,3 +83,294 @@ async def test_loki_is_configured(monkeypatch):
 
     monkeypatch.setattr("src.sources.loki.settings.loki_enabled", False)
     assert LokiSource().is_configured() is False
+
+
+async def test_loki_fetch_deduplicates_overlapping_selectors():
+    stream_response = {
+        "status": "success",
+        "data": {
+            "resultType": "streams",
+            "result": [
+                {
+                    "stream": {"level": "error", "job": "server"},
+                    "values": [["1700000000000000000", "Connection refused to database"]],
+                }
+            ],
+        },
+    }
+    empty_response = {"status": "success", "data": {"resultType": "streams", "result": []}}
+
+    def _route_handler(request):
+        query = request.url.params["query"]
+        if "error" in query and "level" in query:
+            return Response(200, json=stream_response)
+        return Response(200, json=empty_response)
+
+    with respx.mock:
+        respx.get("http://loki:3100/loki/api/v1/query_range").mock(side_effect=_route_handler)
+
+        result = await LokiSource().fetch(lookback_seconds=3600)
+
+    assert "Errors: 1" in result.summary
+    assert result.raw_text.count("Connection refused") == 1
+
+
+async def test_loki_fetch_respects_concurrency_limit(monkeypatch):
+    monkeypatch.setattr("src.sources.loki.settings.loki_max_concurrency", 2)
+    monkeypatch.setattr("src.sources.loki.settings.loki_extra_queries", ['{job="a"}', '{job="b"}'])
+    empty_response = {"status": "success", "data": {"resultType": "streams", "result": []}}
+
+    in_flight = 0
+    peak = 0
+
+    async def _route_handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return Response(200, json=empty_response)
+
+    with respx.mock:
+        route = respx.get("http://loki:3100/loki/api/v1/query_range").mock(side_effect=_route_handler)
+
+        await LokiSource().fetch(lookback_seconds=3600)
+
+    assert route.call_count == 6
+    assert peak == 2
+
+
+async def test_loki_incremental_fetches_only_new_entries(monkeypatch, tmp_path):
+    watermark_path = tmp_path / "watermarks.json"
+    monkeypatch.setattr("src.sources.loki.settings.loki_incremental", True)
+    monkeypatch.setattr("src.sources.loki.settings.loki_watermark_path", str(watermark_path))
+
+    now_ns = int(time.time() * 1e9)
+    first_ts = str(now_ns - 60_000_000_000)
+    second_ts = str(now_ns - 30_000_000_000)
+    batches = {
+        1: [[first_ts, "Connection refused to database"]],
+        2: [[second_ts, "Timeout on request /api/chat"]],
+    }
+    starts: list[int] = []
+    tick = 0
+
+    def _route_handler(request):
+        if request.url.params["query"] != '{level=~"error|ERROR|fatal|FATAL"}':
+            return Response(200, json={"status": "success", "data": {"result": []}})
+        starts.append(int(request.url.params["start"]))
+        values = batches.get(tick, [])
+        result = [{"stream": {"job": "server"}, "values": values}] if values else []
+        return Response(200, json={"status": "success", "data": {"result": result}})
+
+    with respx.mock:
+        respx.get("http://loki:3100/loki/api/v1/query_range").mock(side_effect=_route_handler)
+
+        source = LokiSource()
+        tick = 1
+        await source.fetch(lookback_seconds=3600)
+        tick = 2
+        result = await source.fetch(lookback_seconds=3600)
+
+        restarted = LokiSource()
+        tick = 3
+        resumed = await restarted.fetch(lookback_seconds=3600)
+
+    assert starts[1] == int(first_ts) + 1
+    assert starts[2] == int(second_ts) + 1
+    assert "Errors: 2" in result.summary
+    assert "Connection refused" in result.raw_text
+    assert "Timeout on request" in result.raw_text
+    assert "Connection refused" in resumed.raw_text
+    assert "Timeout on request" in resumed.raw_text
+
+
+async def test_loki_fetch_collapses_repeated_lines_into_templates():
+    values = [[str(1700000000000000000 + i), f"Timeout on request req-{i} after {100 + i}ms"] for i in range(30)]
+    stream_response = {
+        "status": "success",
+        "data": {"result": [{"stream": {"job": "server"}, "values": values}]},
+    }
+    empty_response = {"status": "success", "data": {"result": []}}
+
+    def _route_handler(request):
+        if request.url.params["query"] == '{level=~"error|ERROR|fatal|FATAL"}':
+            return Response(200, json=stream_response)
+        return Response(200, json=empty_response)
+
+    with respx.mock:
+        respx.get("http://loki:3100/loki/api/v1/query_range").mock(side_effect=_route_handler)
+
+        result = await LokiSource().fetch(lookback_seconds=3600)
+
+    assert "Errors: 30" in result.summary
+    assert "[30x," in result.raw_text
+    assert result.raw_text.count("Timeout on request") == 2
+
+
+async def test_loki_fetch_uses_server_side_counts():
+    stream_response = {
+        "status": "success",
+        "data": {"result": [{"stream": {"job": "server"}, "values": [["1700000000000000000", "Connection refused"]]}]},
+    }
+    empty_response = {"status": "success", "data": {"result": []}}
+
+    def _count_handler(request):
+        query = request.url.params["query"]
+        assert "sum by (job) (count_over_time(" in query
+        assert "[3600s]" in query
+        if "error" in query:
+            result = [
+                {"metric": {"job": "server"}, "value": [1700000000, "1200"]},
+                {"metric": {"job": "worker"}, "value": [1700000000, "34"]},
+            ]
+        else:
+            result = [{"metric": {"job": "server"}, "value": [1700000000, "7"]}]
+        return Response(200, json={"status": "success", "data": {"resultType": "vector", "result": result}})
+
+    def _range_handler(request):
+        if request.url.params["query"] == '{level=~"error|ERROR|fatal|FATAL"}':
+            return Response(200, json=stream_response)
+        return Response(200, json=empty_response)
+
+    with respx.mock:
+        respx.get("http://loki:3100/loki/api/v1/query_range").mock(side_effect=_range_handler)
+        respx.get("http://loki:3100/loki/api/v1/query").mock(side_effect=_count_handler)
+
+        result = await LokiSource().fetch(lookback_seconds=3600)
+
+    assert "Errors: 1234, Warnings: 7" in result.summary
+    assert "server: errors=1200 (20.00/min), warnings=7 (0.12/min)" in result.raw_text
+    assert "Connection refused" in result.raw_text
+    assert result.snapshot is not None
+    assert result.snapshot.counts["errors by job"] == {"server": 1200.0, "worker": 34.0}
+
+
+async def test_loki_shards_and_pages_long_lookback(monkeypatch):
+    monkeypatch.setattr("src.sources.loki.settings.loki_shard_seconds", 3600)
+    monkeypatch.setattr("src.sources.loki.settings.loki_page_size", 5)
+    monkeypatch.setattr("src.sources.loki.settings.loki_max_lines_per_query", 40)
+    error_query = '{level=~"error|ERROR|fatal|FATAL"}'
+    requests: list[tuple[int, int, int]] = []
+
+    def _route_handler(request):
+        params = request.url.params
+        if params["query"] != error_query:
+            return Response(200, json={"status": "success", "data": {"result": []}})
+        start, end, limit = int(params["start"]), int(params["end"]), int(params["limit"])
+        assert params["direction"] == "backward"
+        requests.append((start, end, limit))
+        step = (end - start) // 1000
+        values = [[str(end - 1 - i * step), f"event {end - 1 - i * step}"] for i in range(limit)]
+        return Response(
+            200, json={"status": "success", "data": {"result": [{"stream": {"job": "a"}, "values": values}]}}
+        )
+
+    with respx.mock:
+        respx.get("http://loki:3100/loki/api/v1/query_range").mock(side_effect=_route_handler)
+
+        await LokiSource().fetch(lookback_seconds=4 * 3600)
+
+    shard_starts = sorted({start for start, _, _ in requests})
+    assert len(shard_starts) == 4
+    assert len(requests) == 8
+    assert sorted({limit for _, _, limit in requests}) == [5, 6]
+    for start in shard_starts:
+        ends = [end for shard_start, end, _ in requests if shard_start == start]
+        assert ends[1] < ends[0]
+
+
+async def test_loki_query_keeps_the_newest_lines_over_budget(monkeypatch):
+    monkeypatch.setattr("src.sources.loki.settings.loki_page_size", 4)
+    monkeypatch.setattr("src.sources.loki.settings.loki_max_lines_per_query", 10)
+    base = 1_700_000_000_000_000_000
+    stored = [(base + i * 1000, f"event {i}") for i in range(30)]
+    stored.append((base + 26 * 1000, "event 26b"))
+
+    def _route_handler(request):
+        params = request.url.params
+        start, end, limit = int(params["start"]), int(params["end"]), int(params["limit"])
+        matching = sorted((e for e in stored if start <= e[0] < end), reverse=True)[:limit]
+        values = [[str(ts), line] for ts, line in matching]
+        return Response(
+            200, json={"status": "success", "data": {"result": [{"stream": {"job": "a"}, "values": values}]}}
+        )
+
+    with respx.mock:
+        respx.get("http://loki:3100/loki/api/v1/query_range").mock(side_effect=_route_handler)
+        async with httpx.AsyncClient() as client:
+            entries, partial = await LokiSource()._query(
+                client, asyncio.Semaphore(1), '{job="a"}', base, base + 30 * 1000
+            )
+
+    assert partial is False
+    assert len(entries) == 10
+    assert {line for _, _, line in entries} == {f"event {i}" for i in range(21, 30)} | {"event 26b"}
+
+
+async def test_loki_fetch_marks_partial_when_deadline_expires():
+    empty_response = {"status": "success", "data": {"result": []}}
+
+    async def _route_handler(request):
+        if request.url.params["query"] == '{level=~"warning|WARNING"}':
+            await asyncio.sleep(10)
+        return Response(200, json=empty_response)
+
+    with respx.mock:
+        respx.get("http://loki:3100/loki/api/v1/query_range").mock(side_effect=_route_handler)
+
+        deadline = asyncio.get_running_loop().time() + 0.6
+        result = await asyncio.wait_for(LokiSource().fetch(lookback_seconds=3600, deadline=deadline), timeout=2)
+
+    assert result.partial is True
+    assert "partial" in result.summary
+    assert 'Query: {level=~"warning|WARNING"}\n... (partial: fetch deadline reached)' in result.raw_text
+
+
+async def test_loki_fetch_scopes_queries_to_jobs():
+    queries: list[str] = []
+
+    def _record(request):
+        queries.append(request.url.params["query"])
+        return Response(200, json={"status": "success", "data": {"resultType": "streams", "result": []}})
+
+    with respx.mock:
+        respx.get("http://loki:3100/loki/api/v1/query_range").mock(side_effect=_record)
+        respx.get("http://loki:3100/loki/api/v1/query").mock(side_effect=_record)
+
+        await LokiSource().fetch(lookback_seconds=900, jobs=["api", "web.v2"])
+
+    assert queries
+    assert all('job=~"api|web\\\\.v2"' in query for query in queries)
+
+
+async def test_loki_incremental_keeps_watermark_below_truncated_shards(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.sources.loki.settings.loki_incremental", True)
+    monkeypatch.setattr("src.sources.loki.settings.loki_watermark_path", str(tmp_path / "watermarks.json"))
+    monkeypatch.setattr("src.sources.loki.settings.loki_shard_seconds", 1800)
+    monkeypatch.setattr("src.sources.loki.settings.loki_page_size", 2)
+    monkeypatch.setattr("src.sources.loki.settings.loki_max_lines_per_query", 4)
+    error_query = '{level=~"error|ERROR|fatal|FATAL"}'
+    starts: list[int] = []
+
+    def _route_handler(request):
+        params = request.url.params
+        if params["query"] != error_query:
+            return Response(200, json={"status": "success", "data": {"result": []}})
+        start, end, limit = int(params["start"]), int(params["end"]), int(params["limit"])
+        starts.append(start)
+        values = [[str(end - 1 - i * 1000), f"event {end - 1 - i * 1000}"] for i in range(limit)]
+        return Response(
+            200, json={"status": "success", "data": {"result": [{"stream": {"job": "a"}, "values": values}]}}
+        )
+
+    with respx.mock:
+        respx.get("http://loki:3100/loki/api/v1/query_range").mock(side_effect=_route_handler)
+        source = LokiSource()
+        await source.fetch(lookback_seconds=3600)
+        first_start = min(starts)
+        starts.clear()
+        await source.fetch(lookback_seconds=3600)
+
+    assert source._watermarks[error_query] < first_start + 1800 * 1_000_000_000
+    assert min(starts) <= first_start + 1800 * 1_000_000_000
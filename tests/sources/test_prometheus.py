@@ -1,6 +1,9 @@
+import math
+
 import respx
 from httpx import Response
-from src.sources.prometheus import PrometheusSource
+from src.config import MonitorProfile
+from src.sources.prometheus import PrometheusSource, _render_baselines
 
 
 async def test_prometheus_fetch_parses_results():
@@ -58,6 +61,8 @@ async def test_prometheus_detects_down_services():
 
     assert "server" in result.summary
     assert "Down services" in result.summary
+    assert result.snapshot is not None
+    assert result.snapshot.counts["down services"] == {"server": 1.0}
 
 
 async def test_prometheus_handles_connection_error():
@@ -70,3 +75,215 @@ async def test_prometheus_handles_connection_error():
 
     assert result.source_name == "prometheus"
     assert "Error" in result.raw_text
+
+
+async def test_prometheus_range_mode_summarizes_series(monkeypatch):
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_range_enabled", True)
+    values = [[1700000000 + i * 60, "1" if i < 30 else "0"] for i in range(60)]
+    matrix = {
+        "status": "success",
+        "data": {"resultType": "matrix", "result": [{"metric": {"job": "server"}, "values": values}]},
+    }
+    empty = {"status": "success", "data": {"resultType": "matrix", "result": []}}
+
+    def _route_handler(request):
+        assert request.url.params["step"] == "60"
+        return Response(200, json=matrix if request.url.params["query"] == "up" else empty)
+
+    with respx.mock:
+        route = respx.get("http://prometheus:9090/api/v1/query_range").mock(side_effect=_route_handler)
+
+        result = await PrometheusSource().fetch(lookback_seconds=3600)
+
+    assert route.call_count == 5
+    assert "Down services: ['server']" in result.summary
+    assert "!job=server: last=0 min=0 max=1" in result.raw_text
+    assert "shift 1->0" in result.raw_text
+    assert "[5m]" in result.raw_text
+
+
+async def test_prometheus_selects_top_and_bottom_series(monkeypatch):
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_extra_queries", ["per_pod_requests"])
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_top_k", 3)
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_bottom_k", 2)
+    result = [{"metric": {"pod": f"p{i}"}, "value": [1700000000, str(i)]} for i in range(1000)]
+    wide = {"status": "success", "data": {"resultType": "vector", "result": result}}
+    empty = {"status": "success", "data": {"resultType": "vector", "result": []}}
+
+    def _route_handler(request):
+        return Response(200, json=wide if request.url.params["query"] == "per_pod_requests" else empty)
+
+    with respx.mock:
+        respx.get("http://prometheus:9090/api/v1/query").mock(side_effect=_route_handler)
+
+        data = await PrometheusSource().fetch(lookback_seconds=3600)
+
+    section = data.raw_text.split("per_pod_requests (per_pod_requests):\n")[1]
+    lines = section.splitlines()
+    assert lines[:5] == ["  pod=p999: 999", "  pod=p998: 998", "  pod=p997: 997", "  pod=p1: 1", "  pod=p0: 0"]
+    assert lines[5] == "  ... 995 other series (p50=499.5, p95=949 across all 1000)"
+    assert len(lines) == 6
+
+
+async def test_prometheus_topk_pushdown(monkeypatch):
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_extra_queries", ["per_pod_requests"])
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_topk_pushdown", True)
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_top_k", 1)
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_bottom_k", 1)
+    seen: list[str] = []
+
+    def _route_handler(request):
+        query = request.url.params["query"]
+        seen.append(query)
+        if query.startswith("topk(1, (per_pod_requests))"):
+            result = [
+                {"metric": {"pod": "p0"}, "value": [1700000000, "0"]},
+                {"metric": {"pod": "p9"}, "value": [1700000000, "9"]},
+            ]
+        elif query.startswith("label_replace(count((per_pod_requests))"):
+            result = [
+                {"metric": {"__stat__": "count"}, "value": [1700000000, "10"]},
+                {"metric": {"__stat__": "p50"}, "value": [1700000000, "4.5"]},
+                {"metric": {"__stat__": "p95"}, "value": [1700000000, "8.55"]},
+            ]
+        else:
+            result = []
+        return Response(200, json={"status": "success", "data": {"resultType": "vector", "result": result}})
+
+    with respx.mock:
+        respx.get("http://prometheus:9090/api/v1/query").mock(side_effect=_route_handler)
+
+        data = await PrometheusSource().fetch(lookback_seconds=3600)
+
+    assert "up" in seen
+    assert "topk(1, (per_pod_requests)) or bottomk(1, (per_pod_requests))" in seen
+    assert "  pod=p9: 9\n  pod=p0: 0\n  ... 8 other series (p50=4.5, p95=8.55 across all 10)" in data.raw_text
+
+
+async def test_prometheus_topk_pushdown_skips_bottomk_when_disabled(monkeypatch):
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_extra_queries", ["per_pod_requests"])
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_topk_pushdown", True)
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_top_k", 2)
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_bottom_k", 0)
+    seen: list[str] = []
+
+    def _route_handler(request):
+        seen.append(request.url.params["query"])
+        return Response(200, json={"status": "success", "data": {"resultType": "vector", "result": []}})
+
+    with respx.mock:
+        respx.get("http://prometheus:9090/api/v1/query").mock(side_effect=_route_handler)
+
+        await PrometheusSource().fetch(lookback_seconds=3600)
+
+    assert "topk(2, (per_pod_requests))" in seen
+    assert not any("bottomk" in query for query in seen)
+
+
+async def test_prometheus_topk_pushdown_keeps_series_when_stats_fail(monkeypatch):
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_extra_queries", ["per_pod_requests"])
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_topk_pushdown", True)
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_top_k", 0)
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_bottom_k", 2)
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_max_series_per_query", 1)
+    seen: list[str] = []
+
+    def _route_handler(request):
+        query = request.url.params["query"]
+        seen.append(query)
+        if query.startswith("label_replace("):
+            return Response(500, json={"status": "error", "error": "overloaded"})
+        result = []
+        if query == "bottomk(2, (per_pod_requests))":
+            result = [
+                {"metric": {"pod": "p0"}, "value": [1700000000, "0"]},
+                {"metric": {"pod": "p1"}, "value": [1700000000, "1"]},
+            ]
+        return Response(200, json={"status": "success", "data": {"resultType": "vector", "result": result}})
+
+    with respx.mock:
+        respx.get("http://prometheus:9090/api/v1/query").mock(side_effect=_route_handler)
+
+        data = await PrometheusSource().fetch(lookback_seconds=3600)
+
+    assert not any("topk" in query for query in seen)
+    assert "  pod=p0: 0\n  ... (truncated after 1 series)" in data.raw_text
+    assert "other series" not in data.raw_text
+
+
+async def test_prometheus_baselines_are_cached_per_bucket(monkeypatch):
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_baseline_enabled", True)
+    baseline_times: list[float] = []
+
+    def _vector(value: str) -> dict:
+        result = [{"metric": {"job": "server"}, "value": [1700000000, value]}]
+        return {"status": "success", "data": {"resultType": "vector", "result": result}}
+
+    def _route_handler(request):
+        query = request.url.params["query"]
+        if "time" in request.url.params:
+            baseline_times.append(float(request.url.params["time"]))
+            return Response(200, json=_vector("10"))
+        return Response(200, json=_vector("1" if query == "up" else "30"))
+
+    source = PrometheusSource()
+    with respx.mock:
+        respx.get("http://prometheus:9090/api/v1/query").mock(side_effect=_route_handler)
+
+        first = await source.fetch(lookback_seconds=3600)
+        second = await source.fetch(lookback_seconds=3600)
+
+    assert len(baseline_times) == 8
+    assert len({t % 3600 for t in baseline_times}) == 1
+    assert "!Request Rate (3600s) job=server: 30 (x3.00 vs 1d, x3.00 vs 7d)" in first.raw_text
+    assert "4 series >2x off baseline" in first.summary
+    assert second.raw_text == first.raw_text
+
+
+async def test_prometheus_fetch_scopes_builtin_queries_to_jobs():
+    queries: list[str] = []
+
+    def _record(request):
+        queries.append(request.url.params["query"])
+        return Response(200, json={"status": "success", "data": {"resultType": "vector", "result": []}})
+
+    with respx.mock:
+        respx.get("http://prometheus:9090/api/v1/query").mock(side_effect=_record)
+
+        await PrometheusSource().fetch(lookback_seconds=900, jobs=["api"])
+
+    assert 'up{job=~"api"}' in queries
+    assert any("http_requests_total{job=~\"api\", status=~'5..'}" in query for query in queries)
+    assert all('job=~"api"' in query for query in queries)
+
+
+async def test_prometheus_profile_jobs_scope_builtin_queries():
+    queries: list[str] = []
+
+    def _record(request):
+        queries.append(request.url.params["query"])
+        return Response(200, json={"status": "success", "data": {"resultType": "vector", "result": []}})
+
+    source = PrometheusSource(MonitorProfile(name="payments", jobs=["payments-api", "ledger"]))
+    with respx.mock:
+        respx.get("http://prometheus:9090/api/v1/query").mock(side_effect=_record)
+
+        await source.fetch(lookback_seconds=3600)
+        profile_queries, queries[:] = list(queries), []
+        await source.fetch(lookback_seconds=900, jobs=["ledger", "search"])
+
+    assert 'up{job=~"payments\\\\-api|ledger"}' in profile_queries
+    assert 'up{job=~"ledger"}' in queries
+
+
+def test_baselines_ignore_idle_jobs(monkeypatch):
+    monkeypatch.setattr("src.sources.prometheus.settings.prometheus_baseline_offsets", [86400])
+    current = {"P95 Latency": {"job=idle": math.nan, "job=api": 0.9, "job=db": 0.2}}
+    baselines = {"P95 Latency": {86400: {"job=idle": 0.3, "job=api": 0.3, "job=db": math.nan}}}
+
+    text, deviating = _render_baselines(current, baselines)
+
+    assert deviating == 1
+    assert "job=idle" not in text
+    assert "job=db" not in text
+    assert "!P95 Latency job=api" in text
@@ -0,0 +1,61 @@
+import json
+from collections.abc import AsyncIterator
+
+from httpx import AsyncByteStream, Response
+from src.sources.streaming import parse_loki_streams, parse_prometheus_vector
+
+
+def _loki_body(streams: int, lines: int) -> bytes:
+    result = [
+        {
+            "stream": {"job": f"job-{s}"},
+            "values": [[str(1700000000000000000 + i), f"line {s}-{i}"] for i in range(lines)],
+        }
+        for s in range(streams)
+    ]
+    return json.dumps({"status": "success", "data": {"resultType": "streams", "result": result}}).encode()
+
+
+class _ChunkStream(AsyncByteStream):
+    def __init__(self, body: bytes, size: int) -> None:
+        self._chunks = [body[i : i + size] for i in range(0, len(body), size)]
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self._chunks:
+            yield chunk
+
+
+async def test_parse_loki_streams_builds_compact_entries():
+    entries, truncated = await parse_loki_streams(Response(200, content=_loki_body(2, 2)), limit=10, max_bytes=10**6)
+    assert truncated is False
+    assert entries == [
+        ("1700000000000000000", "job=job-0", "line 0-0"),
+        ("1700000000000000001", "job=job-0", "line 0-1"),
+        ("1700000000000000000", "job=job-1", "line 1-0"),
+        ("1700000000000000001", "job=job-1", "line 1-1"),
+    ]
+
+
+async def test_parse_loki_streams_stops_at_line_budget():
+    entries, truncated = await parse_loki_streams(Response(200, content=_loki_body(3, 10)), limit=15, max_bytes=10**6)
+    assert truncated is True
+    assert len(entries) == 15
+    assert entries[-1][1] == "job=job-1"
+
+
+async def test_parse_loki_streams_stops_at_byte_ceiling():
+    body = _loki_body(50, 200)
+    response = Response(200, stream=_ChunkStream(body, 4096))
+    entries, truncated = await parse_loki_streams(response, limit=10**6, max_bytes=16384)
+    assert truncated is True
+    assert 0 < len(entries) < 50 * 200
+
+
+async def test_parse_prometheus_vector_stops_at_series_budget():
+    result = [{"metric": {"pod": f"p{i}"}, "value": [1700000000, str(i)]} for i in range(100)]
+    body = json.dumps({"status": "success", "data": {"resultType": "vector", "result": result}}).encode()
+
+    samples, truncated = await parse_prometheus_vector(Response(200, content=body), limit=5, max_bytes=10**6)
+
+    assert truncated is True
+    assert samples == [({"pod": f"p{i}"}, str(i)) for i in range(5)]
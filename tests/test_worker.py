@@ -0,0 +1,19 @@
+from unittest.mock import AsyncMock, patch
+
+from src.worker import run_worker
+
+
+async def test_worker_serves_its_own_metrics(monkeypatch):
+    monkeypatch.setattr("src.worker.settings.worker_metrics_port", 9191)
+    monkeypatch.setattr("src.worker.settings.host", "127.0.0.1")
+    monkeypatch.setattr("src.worker.settings.report_store_enabled", False)
+
+    with (
+        patch("src.worker.start_http_server") as start_http_server,
+        patch("src.worker.load_tokenizers", AsyncMock()),
+        patch("src.worker.run_monitors", AsyncMock()) as run_monitors,
+    ):
+        await run_worker()
+
+    start_http_server.assert_called_once_with(9191, addr="127.0.0.1")
+    run_monitors.assert_awaited_once()